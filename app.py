@@ -5,13 +5,19 @@ Main Streamlit application entry point.
 Run with:  streamlit run app.py
 """
 
+import io
+import html
+import random
 import time
+from pathlib import Path
 import streamlit as st
 from PIL import Image
+from loguru import logger
 
 import config
 import ocr_engine
 import llm_engine
+from llm_engine import ChatMsg
 import socratic_prompt
 import multilingual
 from understanding_meter import UnderstandingMeter
@@ -29,13 +35,21 @@ st.set_page_config(
 
 # ─── Custom CSS ───────────────────────────────────────────────────────────────
 
-def inject_css():
-    css = f"""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700;800&family=Noto+Sans+Devanagari:wght@400;500;600&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Fira+Code:wght@400;500&display=swap');
+_CSS_PATH = Path(__file__).parent / "static" / "app.css"
 
-    :root {{
+
+# cache_resource hands back the same str object; cache_data would pickle and
+# unpickle it on every rerun
+@st.cache_resource
+def _built_css() -> str:
+    """
+    The :root palette plus static/app.css, read from disk once and inlined.
+    (Streamlit's static serving sends .css as text/plain with nosniff, so
+    browsers refuse a <link> to it.)
+    """
+    root = """
+    <style>
+    :root {
         --primary:   #8A2BE2; /* BlueViolet */
         --secondary: #FF2A6D; /* Neon Pink */
         --tertiary:  #05D9E8; /* Cyan */
@@ -44,297 +58,19 @@ def inject_css():
         --surface-border: rgba(255, 255, 255, 0.08);
         --text-main: #F8FAFC;
         --text-muted: #94A3B8;
-    }}
-
-    /* Global Typography & Background */
-    html, body, [class*="css"] {{
-        font-family: 'Outfit', 'Noto Sans Devanagari', sans-serif !important;
-        background-color: var(--bg-color) !important;
-        background-image: 
-            radial-gradient(circle at 15% 50%, rgba(138, 43, 226, 0.08) 0%, transparent 50%),
-            radial-gradient(circle at 85% 30%, rgba(5, 217, 232, 0.08) 0%, transparent 50%);
-        background-attachment: fixed;
-        color: var(--text-main) !important;
-    }}
-
-    /* Hide standard Streamlit Elements */
-    #MainMenu {{visibility: hidden;}}
-    footer {{visibility: hidden;}}
-    header[data-testid="stHeader"] {{background: transparent !important;}}
-    .stApp > header {{background-color: transparent !important;}}
-
-    /* Elegant Custom Scrollbar */
-    ::-webkit-scrollbar {{ width: 8px; height: 8px; }}
-    ::-webkit-scrollbar-track {{ background: transparent; }}
-    ::-webkit-scrollbar-thumb {{ background: rgba(255,255,255,0.15); border-radius: 10px; }}
-    ::-webkit-scrollbar-thumb:hover {{ background: rgba(255,255,255,0.25); }}
-
-    /* Layout Constraints */
-    .stApp > main > div.block-container {{
-        padding-top: 2rem;
-        padding-bottom: 4rem;
-        max-width: 1300px;
-    }}
-
-    /* Custom App Header */
-    .app-header {{
-        background: var(--surface);
-        backdrop-filter: blur(20px);
-        -webkit-backdrop-filter: blur(20px);
-        border: 1px solid var(--surface-border);
-        padding: 1.5rem 2.5rem;
-        display: flex;
-        align-items: center;
-        gap: 1.5rem;
-        margin-bottom: 2.5rem;
-        border-radius: 24px;
-        box-shadow: 0 10px 40px rgba(0, 0, 0, 0.4), inset 0 1px 0 rgba(255,255,255,0.05);
-        position: relative;
-        overflow: hidden;
-    }}
-    .app-header::before {{
-        content: ''; position: absolute; top: 0; left: 0; right: 0; height: 1px;
-        background: linear-gradient(90deg, transparent, var(--primary), var(--tertiary), transparent);
-        opacity: 0.6;
-    }}
-    .app-title {{
-        font-size: 2.4rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, #FFF 0%, #A5B4FC 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin: 0;
-        letter-spacing: -0.02em;
-        line-height: 1.2;
-    }}
-    .app-tagline {{
-        font-size: 0.95rem;
-        font-weight: 500;
-        color: var(--tertiary);
-        margin: 0.2rem 0 0 0;
-        letter-spacing: 0.05em;
-        text-transform: uppercase;
-    }}
-
-    /* Glass Cards */
-    .card {{
-        background: var(--surface);
-        backdrop-filter: blur(16px);
-        -webkit-backdrop-filter: blur(16px);
-        border: 1px solid var(--surface-border);
-        border-radius: 20px;
-        padding: 2.5rem;
-        margin-bottom: 1.5rem;
-        text-align: center;
-        box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-        transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-    }}
-    .card:hover {{
-        border-color: rgba(138, 43, 226, 0.4);
-        transform: translateY(-2px);
-        box-shadow: 0 15px 50px rgba(0,0,0,0.4), 0 0 20px rgba(138, 43, 226, 0.15);
-    }}
-
-    /* Chat Messages */
-    .msg-ai, .msg-student {{
-        padding: 1.25rem 1.5rem;
-        margin: 1.2rem 0;
-        font-size: 1.05rem;
-        line-height: 1.6;
-        border-radius: 20px;
-        position: relative;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.2);
-        animation: fadeIn 0.4s ease-out;
-    }}
-    @keyframes fadeIn {{ from {{ opacity: 0; transform: translateY(10px); }} to {{ opacity: 1; transform: translateY(0); }} }}
-
-    .msg-ai {{
-        background: linear-gradient(145deg, rgba(30, 41, 59, 0.8), rgba(15, 23, 42, 0.9));
-        border: 1px solid rgba(138, 43, 226, 0.25);
-        border-bottom-left-radius: 4px;
-        margin-right: 10%;
-    }}
-    .msg-ai::before {{
-        content: ''; position: absolute; top: -1px; left: -1px; bottom: -1px; width: 4px;
-        background: linear-gradient(to bottom, var(--primary), var(--tertiary));
-        border-radius: 4px 0 0 4px;
-    }}
-    
-    .msg-student {{
-        background: linear-gradient(145deg, rgba(138, 43, 226, 0.15), rgba(138, 43, 226, 0.05));
-        border: 1px solid rgba(138, 43, 226, 0.4);
-        border-bottom-right-radius: 4px;
-        margin-left: 10%;
-        text-align: right;
-    }}
-
-    .msg-header {{
-        font-size: 0.8rem;
-        font-weight: 700;
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-        margin-bottom: 0.6rem;
-        opacity: 0.9;
-    }}
-    .msg-ai .msg-header {{ color: var(--tertiary); }}
-    .msg-student .msg-header {{ color: #FFF; }}
-
-    /* Animated Understanding Meter */
-    .meter-container {{
-        background: rgba(0,0,0,0.5);
-        border-radius: 100px;
-        height: 14px;
-        overflow: hidden;
-        margin: 0.8rem 0;
-        border: 1px solid rgba(255,255,255,0.05);
-        box-shadow: inset 0 2px 4px rgba(0,0,0,0.5);
-    }}
-    .meter-fill {{
-        height: 100%;
-        border-radius: 100px;
-        transition: width 1s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        background: linear-gradient(90deg, var(--secondary), var(--primary), var(--tertiary));
-        background-size: 200% 100%;
-        animation: gradientMove 3s linear infinite;
-        box-shadow: 0 0 10px rgba(5, 217, 232, 0.5);
-    }}
-    @keyframes gradientMove {{ 0% {{background-position: 100% 50%;}} 100% {{background-position: 0% 50%;}} }}
-    
-    .meter-label {{
-        display: flex;
-        justify-content: space-between;
-        font-size: 0.75rem;
-        font-weight: 700;
-        color: var(--text-muted);
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-    }}
-
-    /* Glow Badges */
-    .badge {{
-        display: inline-flex;
-        align-items: center;
-        gap: 0.4rem;
-        background: rgba(138, 43, 226, 0.2);
-        border: 1px solid rgba(138, 43, 226, 0.6);
-        color: #FFF;
-        border-radius: 100px;
-        padding: 0.25rem 0.8rem;
-        font-size: 0.75rem;
-        font-weight: 800;
-        letter-spacing: 0.05em;
-        text-transform: uppercase;
-        box-shadow: 0 0 15px rgba(138, 43, 226, 0.3);
-    }}
-
-    /* OCR Code Box */
-    .ocr-box {{
-        background: rgba(11, 15, 25, 0.7);
-        border: 1px dashed rgba(5, 217, 232, 0.5);
-        border-radius: 16px;
-        padding: 1.5rem;
-        font-family: 'Fira Code', 'Courier New', monospace;
-        font-size: 0.95rem;
-        color: var(--tertiary);
-        min-height: 80px;
-        white-space: pre-wrap;
-        box-shadow: inset 0 4px 15px rgba(0,0,0,0.5);
-    }}
-
-    /* Streamlit Input Overrides */
-    
-    /* Sidebar */
-    section[data-testid="stSidebar"] {{
-        background-color: rgba(6, 9, 20, 0.85) !important;
-        backdrop-filter: blur(24px);
-        -webkit-backdrop-filter: blur(24px);
-        border-right: 1px solid var(--surface-border);
-    }}
-
-    /* Primary Buttons */
-    .stButton > button {{
-        width: 100%;
-        background: linear-gradient(135deg, var(--primary) 0%, #4F46E5 100%) !important;
-        color: white !important;
-        border: 1px solid rgba(255,255,255,0.15) !important;
-        border-radius: 14px !important;
-        padding: 0.75rem 1.5rem !important;
-        font-family: 'Outfit', sans-serif !important;
-        font-weight: 700 !important;
-        font-size: 1.05rem !important;
-        letter-spacing: 0.03em !important;
-        transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1) !important;
-        box-shadow: 0 4px 15px rgba(138, 43, 226, 0.4) !important;
-        text-transform: uppercase;
-    }}
-    .stButton > button:hover {{
-        transform: translateY(-2px) !important;
-        box-shadow: 0 8px 25px rgba(138, 43, 226, 0.6) !important;
-        border-color: rgba(255,255,255,0.4) !important;
-    }}
-    .stButton > button:active {{ transform: translateY(1px) !important; }}
-
-    /* File Uploader area */
-    [data-testid="stFileUploader"] {{
-        background: var(--surface) !important;
-        border: 2px dashed rgba(138, 43, 226, 0.5) !important;
-        border-radius: 16px !important;
-        padding: 1.5rem !important;
-        transition: border-color 0.3s ease !important;
-    }}
-    [data-testid="stFileUploader"]:hover {{
-        border-color: var(--tertiary) !important;
-    }}
-
-    /* Text Areas & Select Boxes */
-    .stTextArea textarea, 
-    .stSelectbox div[data-baseweb="select"] > div {{
-        background: rgba(11, 15, 25, 0.8) !important;
-        border: 1px solid rgba(138, 43, 226, 0.3) !important;
-        border-radius: 12px !important;
-        color: var(--text-main) !important;
-        font-family: 'Outfit', sans-serif !important;
-        font-size: 1rem !important;
-        padding: 0.75rem !important;
-        transition: all 0.3s ease !important;
-    }}
-    .stTextArea textarea:focus, 
-    .stSelectbox div[data-baseweb="select"] > div:focus-within {{
-        border-color: var(--tertiary) !important;
-        box-shadow: 0 0 0 3px rgba(5, 217, 232, 0.2) !important;
-    }}
-
-    /* Radio Group */
-    [data-testid="stRadio"] > div {{
-        background: var(--surface);
-        padding: 0.8rem;
-        border-radius: 14px;
-        border: 1px solid var(--surface-border);
-    }}
-
-    hr {{ border-color: rgba(255, 255, 255, 0.08); margin: 2rem 0; }}
-    
-    /* Headers & Text Formatting */
-    h1, h2, h3, h4, h5, h6 {{
-        color: var(--text-main) !important;
-        font-family: 'Outfit', sans-serif !important;
-        font-weight: 700 !important;
-        letter-spacing: -0.01em !important;
-    }}
-    h3 {{ font-size: 1.6rem !important; margin-bottom: 1.2rem !important; color: #F8FAFC !important; }}
-    p, li, div {{ color: var(--text-main); }}
-    
-    /* Metrics panel styling */
-    [data-testid="stMetricValue"] {{
-        font-size: 2rem !important;
-        font-weight: 800 !important;
-        background: linear-gradient(135deg, var(--tertiary) 0%, #A5B4FC 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }}
+    }
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
+    return root + f"<style>{_CSS_PATH.read_text(encoding='utf-8')}</style>"
+
+
+def inject_css():
+    # Streamlit drops elements that are not re-emitted on a rerun, so the
+    # markup must still be written every run — only its build is cached.
+    st.markdown(
+        _built_css(),
+        unsafe_allow_html=True,
+    )
 
 inject_css()
 
@@ -342,16 +78,19 @@ inject_css()
 
 def init_session():
     defaults = {
-        "chat_history":    [],   # [{"role": "user"|"assistant", "content": "..."}]
-        "ocr_text":        "",
+        "chat_history":    [],   # [llm_engine.ChatMsg]
+        "ocr_text":        "",   # raw text fed to the LLM
+        "ocr_text_html":   "",   # escaped once for the result box
         "subject":         "general",
         "language":        config.DEFAULT_LANGUAGE,
         "meter":           UnderstandingMeter(),
         "wrong_streak":    0,
         "session_active":  False,
-        "captured_image":  None,
+        "captured_bytes":  None,   # encoded image; also the OCR/preview cache key
         "uploaded_doc":    None,
         "current_emotion": "neutral",
+        "pending_reply":   False,  # last history entry still awaits a tutor reply
+        "audio_toggle":    True,
     }
     for key, val in defaults.items():
         if key not in st.session_state:
@@ -359,6 +98,25 @@ def init_session():
 
 init_session()
 
+
+# Model init (torch import + weights, several seconds) overlaps app start-up
+# and the user choosing an image instead of blocking the first Extract click
+ocr_engine.warmup()
+
+
+def _teardown_engines():
+    """Stop every background engine; one failing must not block the others."""
+    for stop in (
+        llm_engine.reset_demo,
+        emotion_bg_engine.stop,
+        ocr_engine.release_camera,
+        tts_engine.stop,
+    ):
+        try:
+            stop()
+        except Exception as e:
+            logger.warning(f"Engine teardown failed in {stop.__qualname__}: {e}")
+
 # ─── App Header ───────────────────────────────────────────────────────────────
 
 st.markdown(
@@ -374,6 +132,38 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+
+def _on_audio_toggle():
+    # Switching voice back on is the user's explicit retry after a TTS failure
+    if st.session_state.audio_toggle:
+        tts_engine.reenable()
+
+
+@st.cache_resource(show_spinner=False, max_entries=128)
+def meter_html(score: int, color: str, emoji: str, badge: str, label: str) -> str:
+    """Understanding Meter markup, memoised so non-meter reruns skip rebuilding it."""
+    return f"""
+    <hr>
+    <div>
+        <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:4px;">
+            <span style="font-size:0.85rem;font-weight:600;color:rgba(232,236,244,0.8)">
+                {label}
+            </span>
+            <span class="badge">{emoji} {badge}</span>
+        </div>
+        <div class="meter-container">
+            <div class="meter-fill" style="width:{score}%"></div>
+        </div>
+        <div class="meter-label">
+            <span>0%</span>
+            <span style="color:{color};font-weight:700">{score}%</span>
+            <span>100%</span>
+        </div>
+    </div>
+    <hr>
+    """
+
+
 # ─── Sidebar ─────────────────────────────────────────────────────────────────
 
 with st.sidebar:
@@ -381,13 +171,22 @@ with st.sidebar:
 
     selected_lang = st.selectbox(
         "🌐 Language / भाषा",
-        options=list(config.SUPPORTED_LANGUAGES.keys()),
-        index=list(config.SUPPORTED_LANGUAGES.keys()).index(st.session_state.language),
+        options=config.LANG_NAMES,
+        index=config.LANG_INDEX[st.session_state.language],
+        key="lang_select",
     )
     st.session_state.language = selected_lang
     lang_code = multilingual.get_lang_code(selected_lang)
 
-    enable_audio = st.toggle("🔊 Enable Vāṇī Voice", value=True)
+    # After repeated driver failures the engine disables itself; reflect that
+    # in the toggle instead of quietly re-arming it on every rerun
+    if tts_engine.is_disabled:
+        st.session_state.audio_toggle = False
+    enable_audio = st.toggle(
+        "🔊 Enable Vāṇī Voice", key="audio_toggle", on_change=_on_audio_toggle
+    )
+    if tts_engine.is_disabled:
+        st.warning("Voice output stopped after repeated speech errors. Switch it back on to retry.")
     tts_engine.set_muted(not enable_audio)
 
     st.markdown("---")
@@ -414,55 +213,45 @@ with st.sidebar:
             
         render_emotion_tracker()
 
-    st.markdown("---")
-
-    # Understanding Meter display
+    # Understanding Meter display (rules above and below batched into the same block)
     meter = st.session_state.meter
     st.markdown(
-        f"""
-        <div>
-            <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:4px;">
-                <span style="font-size:0.85rem;font-weight:600;color:rgba(232,236,244,0.8)">
-                    {multilingual.get_phrase("understanding", lang_code)}
-                </span>
-                <span class="badge">{meter.emoji} {meter._badge(meter.score)}</span>
-            </div>
-            <div class="meter-container">
-                <div class="meter-fill" style="width:{meter.score}%"></div>
-            </div>
-            <div class="meter-label">
-                <span>0%</span>
-                <span style="color:{meter.color};font-weight:700">{meter.score}%</span>
-                <span>100%</span>
-            </div>
-        </div>
-        """,
+        meter_html(
+            meter.score,
+            meter.color,
+            meter.emoji,
+            meter._badge(meter.score),
+            multilingual.get_phrase("understanding", lang_code),
+        ),
         unsafe_allow_html=True,
     )
 
-    st.markdown("---")
-
-    if st.button(f"🔄 {multilingual.get_phrase('new_session', lang_code)}"):
-        for key in ["chat_history", "ocr_text", "session_active", "captured_image", "uploaded_doc"]:
-            st.session_state[key] = [] if key == "chat_history" else (
-                "" if key == "ocr_text" else (False if key == "session_active" else None)
-            )
-        st.session_state.meter = UnderstandingMeter()
-        st.session_state.current_emotion = "neutral"
-        llm_engine.reset_demo()
-        emotion_bg_engine.stop()
-        tts_engine.stop()
+    if st.button(f"🔄 {multilingual.get_phrase('new_session', lang_code)}", key="new_session_btn"):
+        st.session_state.update({
+            "chat_history":    [],
+            "ocr_text":        "",
+            "ocr_text_html":   "",
+            "session_active":  False,
+            "captured_bytes":  None,
+            "uploaded_doc":    None,
+            "meter":           UnderstandingMeter(),
+            "current_emotion": "neutral",
+            "pending_reply":   False,
+        })
+        _teardown_engines()
         st.rerun()
 
-    st.markdown("---")
-    st.markdown("### 📊 Session Stats")
-    st.metric("Turns", meter.turn_count)
-    st.metric("Score", f"{meter.score}%")
-    st.metric("Subject", st.session_state.subject.capitalize())
-
-    st.markdown("---")
+    # Session stats and the offline footer in one block
     st.markdown(
-        """
+        f"""
+        <hr>
+        <h3>📊 Session Stats</h3>
+        <div class="stats-grid">
+            <div><div class="stat-label">Turns</div><div class="stat-value">{meter.turn_count}</div></div>
+            <div><div class="stat-label">Score</div><div class="stat-value">{meter.score}%</div></div>
+            <div><div class="stat-label">Subject</div><div class="stat-value">{st.session_state.subject.capitalize()}</div></div>
+        </div>
+        <hr>
         <div style="font-size:0.75rem;color:rgba(232,236,244,0.4);line-height:1.6">
             🔒 <b>Fully Offline</b> · No internet required<br>
             ⚡ CPU-only · Runs on Intel i3 + 8GB RAM<br>
@@ -476,46 +265,204 @@ with st.sidebar:
 
 col_left, col_right = st.columns([1, 1.4], gap="large")
 
+def _bubble_text(content: str) -> str:
+    """Escape chat text for a bubble; <br> keeps a blank line from ending the HTML block."""
+    return html.escape(content).replace("\n", "<br>")
+
+
+def ai_message_html(content: str) -> str:
+    return f"""
+        <div class="msg-ai">
+            <div class="msg-header">🤖 {multilingual.get_phrase("tutor_says", lang_code)}</div>
+            {_bubble_text(content)}
+        </div>
+        """
+
+
+def student_message_html(content: str) -> str:
+    return f"""
+        <div class="msg-student">
+            <div class="msg-header">🎒 You</div>
+            {_bubble_text(content)}
+        </div>
+        """
+
+
+def stream_reply(
+    system_message: str, history: list, user_message: str, turn_context: str = ""
+) -> str:
+    """Render the tutor reply token-by-token at the current position and return the full text."""
+    placeholder = st.empty()
+    placeholder.markdown(ai_message_html("Vāṇī is thinking…"), unsafe_allow_html=True)
+
+    buf = []
+    for token in llm_engine.generate_stream(
+        system_message=system_message,
+        history=history,
+        user_message=user_message,
+        turn_context=turn_context,
+    ):
+        buf.append(token)
+        placeholder.markdown(ai_message_html("".join(buf)), unsafe_allow_html=True)
+    return "".join(buf).strip()
+
+
+def render_tts_controls(i: int, content: str):
+    """Speak/stop buttons shown under each tutor message."""
+    btn_col1, btn_col2, _ = st.columns([1, 1, 4])
+    with btn_col1:
+        if st.button("🔊 Speak", key=f"speak_btn_{i}"):
+            tts_engine.say(content)
+    with btn_col2:
+        if st.button("🛑 Stop", key=f"stop_btn_{i}"):
+            tts_engine.stop()
+
+
+@st.fragment
+def render_chat(lang: str):
+    """
+    Chat history panel. As a fragment, clicking a Speak/Stop button reruns
+    only this panel instead of the whole script.
+    """
+    if not st.session_state.session_active:
+        st.markdown(
+            """
+            <div class="card" style="text-align:center;padding:3rem 2rem">
+                <div style="font-size:3rem">📖</div>
+                <h3 style="color:rgba(232,236,244,0.7);font-weight:500;margin:0.5rem 0">
+                    Ready to learn?
+                </h3>
+                <p style="color:rgba(232,236,244,0.4);font-size:0.9rem">
+                    Upload an image or capture from webcam to start your Socratic tutoring session.
+                </p>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+    else:
+        # Render chat history. Consecutive messages go out as one markdown
+        # block, flushed at each tutor message so its Speak/Stop buttons follow it.
+        html_parts = []
+        for i, msg in enumerate(st.session_state.chat_history):
+            if msg.role == "assistant":
+                html_parts.append(ai_message_html(msg.content))
+                st.markdown("".join(html_parts), unsafe_allow_html=True)
+                html_parts = []
+                render_tts_controls(i, msg.content)
+
+            elif msg.role == "user" and msg.display:
+                html_parts.append(student_message_html(msg.content))
+
+        if html_parts:
+            st.markdown("".join(html_parts), unsafe_allow_html=True)
+
+        # A student turn (or the intro) is waiting for a reply: stream it
+        # below the history in this same run instead of rerunning the script.
+        if st.session_state.get("pending_reply", False):
+            # The flag (and last_result) are only cleared once the reply is in
+            # the history: if a widget click stops the script mid-stream, the
+            # next run streams the reply again instead of dropping the turn
+            history = st.session_state.chat_history
+            result = st.session_state.get("last_result")
+
+            # Confidently correct answers can skip the LLM with a templated
+            # follow-up (English only: the templates are not localised)
+            if (
+                result is not None
+                and result["verdict"] == "correct"
+                and result["score"] >= config.CANNED_MIN_SCORE
+                and lang_code == "en"
+                and random.random() < config.CANNED_RATE
+            ):
+                ai_response = socratic_prompt.pick_canned_followup(st.session_state.subject)
+                st.markdown(ai_message_html(ai_response), unsafe_allow_html=True)
+            else:
+                # The session-constant prefix leads the prompt; the per-turn
+                # mode/state goes after the history so Ollama's KV cache
+                # for the system prompt + earlier turns stays valid
+                ai_response = stream_reply(
+                    system_message=socratic_prompt.build_system_prefix(
+                        lang, st.session_state.subject
+                    ),
+                    history=history[:-1],
+                    user_message=history[-1].content,
+                    turn_context=socratic_prompt.build_system_suffix(
+                        subject=st.session_state.subject,
+                        understanding_score=st.session_state.meter.score,
+                        wrong_answer_count=st.session_state.meter.wrong_streak,
+                        emotion=st.session_state.current_emotion,
+                    ),
+                )
+
+            history.append(ChatMsg("assistant", ai_response))
+            st.session_state.pending_reply = False
+            st.session_state.pop("last_result", None)
+
+            # Queue TTS voice once the turn is committed, so a retried stream
+            # isn't spoken twice
+            tts_engine.start()
+            tts_engine.say(ai_response)
+            render_tts_controls(len(history) - 1, ai_response)
+
+            # Display scoring feedback briefly
+            if result is not None:
+                verdict_emoji = {"correct": "✅", "partial": "🔶", "incorrect": "❌"}
+                st.toast(
+                    f"{result['verdict'].capitalize()} | Score: {result['score']}%",
+                    icon=verdict_emoji.get(result["verdict"], "💬"),
+                )
+
+
+def _open_image(img_bytes: bytes) -> Image.Image:
+    """Decode uploaded bytes to a downscaled RGB image, skipping redundant copies."""
+    img = Image.open(io.BytesIO(img_bytes))
+    # JPEGs can be scaled down during DCT decoding; no-op for other formats
+    img.draft("RGB", (config.IMAGE_MAX_EDGE, config.IMAGE_MAX_EDGE))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return ocr_engine.downscale_image(img)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_extract_text(img_bytes: bytes, preprocess: bool = True) -> str:
+    """OCR memoised on the encoded image bytes, so re-extracting the same photo is instant."""
+    # Decode the same way as annotated_preview so the OCR pass it already
+    # ran for the boxes is reused instead of repeated
+    img_bgr = ocr_engine.decode_image_bgr(img_bytes)
+    if img_bgr is None:
+        return ocr_engine.extract_text(_open_image(img_bytes), preprocess=preprocess)
+    return ocr_engine.extract_text(img_bgr, preprocess=preprocess, bgr=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def annotated_preview(img_bytes: bytes):
+    """Bounding-box preview memoised on the image bytes, so reruns skip the detection pass."""
+    # OpenCV decodes straight to the BGR layout the box drawing works in
+    img_bgr = ocr_engine.decode_image_bgr(img_bytes)
+    if img_bgr is None:
+        return ocr_engine.draw_bounding_boxes(_open_image(img_bytes))
+    return ocr_engine.draw_bounding_boxes(img_bgr, bgr=True)
+
+
 def start_tutoring_session(text: str, lang: str, empty_warning: str):
     if text.strip():
         st.session_state.ocr_text   = text
+        # Escaped here rather than on every rerun; <br> keeps the markup one HTML block
+        st.session_state.ocr_text_html = html.escape(text).replace("\n", "<br>")
         st.session_state.subject    = socratic_prompt.detect_subject(text)
         st.session_state.session_active = True
         st.session_state.chat_history   = []
         st.session_state.meter          = UnderstandingMeter()
         llm_engine.reset_demo()
         
-        # Start backend emotion tracker
+        # Start backend emotion tracker (it needs the webcam to itself)
+        ocr_engine.release_camera()
         emotion_bg_engine.start()
 
-        # Generate first Socratic question
-        meter = st.session_state.meter
-        sys_prompt = socratic_prompt.build_system_prompt(
-            language=lang,
-            subject=st.session_state.subject,
-            understanding_score=meter.score,
-            wrong_answer_count=meter.wrong_streak,
-            emotion=st.session_state.current_emotion,
-        )
+        # The first Socratic question is streamed by the chat panel on rerun
         intro = socratic_prompt.build_intro_message(text, lang)
-
-        with st.spinner("Vāṇī is thinking…"):
-            ai_response = llm_engine.generate(
-                system_message=sys_prompt,
-                history=[],
-                user_message=intro,
-            )
-        
-        # Start TTS and queue the first message
-        tts_engine.start()
-        tts_engine.say(ai_response)
-
-        st.session_state.chat_history.append(
-            {"role": "user", "content": intro}
-        )
-        st.session_state.chat_history.append(
-            {"role": "assistant", "content": ai_response}
-        )
+        st.session_state.chat_history.append(ChatMsg("user", intro))
+        st.session_state.pending_reply = True
         st.rerun()
     else:
         st.warning(empty_warning)
@@ -530,47 +477,51 @@ with col_left:
         ["📤 Upload File", "📸 Webcam Snapshot"],
         horizontal=True,
         label_visibility="collapsed",
+        key="input_mode",
     )
 
-    captured_img = None
-
     if input_mode == "📤 Upload File":
         uploaded = st.file_uploader(
             multilingual.get_phrase("upload_image", lang_code) + " or Document (PDF/DOCX)",
             type=["jpg", "jpeg", "png", "bmp", "webp", "pdf", "docx"],
             label_visibility="collapsed",
+            # Stable key: the label is translated, so an auto key would drop
+            # the uploaded file whenever the language changes
+            key="uploader",
         )
         if uploaded:
             if uploaded.name.lower().endswith((".pdf", ".docx")):
-                st.session_state.captured_image = None
+                st.session_state.captured_bytes = None
                 st.session_state.uploaded_doc = uploaded
             else:
-                captured_img = Image.open(uploaded).convert("RGB")
-                st.session_state.captured_image = captured_img
+                # Decoding is left to the cached preview / OCR helpers
+                st.session_state.captured_bytes = uploaded.getvalue()
                 st.session_state.uploaded_doc = None
 
     else:
-        if st.button(f"📸 {multilingual.get_phrase('capture_btn', lang_code)}"):
+        if st.button(f"📸 {multilingual.get_phrase('capture_btn', lang_code)}", key="capture_btn"):
             with st.spinner("Opening webcam…"):
                 frame = ocr_engine.capture_frame(config.WEBCAM_INDEX)
                 if frame is not None:
-                    captured_img = Image.fromarray(frame)
-                    st.session_state.captured_image = captured_img
+                    captured_img = ocr_engine.downscale_image(Image.fromarray(frame))
+                    png = io.BytesIO()
+                    captured_img.save(png, format="PNG")
+                    st.session_state.captured_bytes = png.getvalue()
                     st.session_state.uploaded_doc = None
                     st.success("Frame captured!")
                 else:
                     st.error("Could not open webcam. Please check connection.")
 
     # Show captured image + Run OCR
-    if st.session_state.captured_image is not None:
-        img = st.session_state.captured_image
-        img_np = ocr_engine.pil_to_cv2(img)
-        annotated = ocr_engine.draw_bounding_boxes(img_np)
+    if st.session_state.captured_bytes is not None:
+        annotated = annotated_preview(st.session_state.captured_bytes)
         st.image(annotated, caption="Detected text regions highlighted", use_container_width=True)
 
         if st.button("🔍 Extract & Start Tutoring"):
+            llm_engine.warmup()
+            emotion_bg_engine.warmup()
             with st.spinner("Running OCR…"):
-                text = ocr_engine.extract_text(img, preprocess=True)
+                text = cached_extract_text(st.session_state.captured_bytes, preprocess=True)
             start_tutoring_session(text, selected_lang, "No text detected. Try a clearer image or better lighting.")
 
     # Show Document + Extract Text
@@ -579,17 +530,24 @@ with col_left:
         st.info(f"📄 Document Loaded: **{doc.name}**")
 
         if st.button("🔍 Parse & Start Tutoring"):
+            llm_engine.warmup()
+            emotion_bg_engine.warmup()
             with st.spinner("Reading Document…"):
                 import document_parser
                 doc.seek(0)
-                text = document_parser.parse_document(doc.read(), doc.name)
+                doc_bytes = doc.read()
+                text = document_parser.parse_document(doc_bytes, doc.name)
+                if not text.strip() and doc.name.lower().endswith(".pdf"):
+                    # Image-only (scanned) PDF: OCR its pages in one batch
+                    pages = document_parser.render_pdf_pages(doc_bytes)
+                    text = "\n".join(ocr_engine.extract_text_batch(pages)).strip()
             start_tutoring_session(text, selected_lang, "No text detected in the document. It might be empty or image-based.")
 
     # OCR Result Box
     if st.session_state.ocr_text:
         st.markdown("#### 📝 " + multilingual.get_phrase("extracted_text", lang_code))
         st.markdown(
-            f'<div class="ocr-box">{st.session_state.ocr_text}</div>',
+            f'<div class="ocr-box">{st.session_state.ocr_text_html}</div>',
             unsafe_allow_html=True,
         )
         st.caption(f"Subject detected: **{st.session_state.subject.capitalize()}**")
@@ -599,128 +557,45 @@ with col_left:
 with col_right:
     st.markdown("### 💬 Tutoring Session")
 
-    chat_placeholder = st.container()
-
-    with chat_placeholder:
-        if not st.session_state.session_active:
-            st.markdown(
-                """
-                <div class="card" style="text-align:center;padding:3rem 2rem">
-                    <div style="font-size:3rem">📖</div>
-                    <h3 style="color:rgba(232,236,244,0.7);font-weight:500;margin:0.5rem 0">
-                        Ready to learn?
-                    </h3>
-                    <p style="color:rgba(232,236,244,0.4);font-size:0.9rem">
-                        Upload an image or capture from webcam to start your Socratic tutoring session.
-                    </p>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-        else:
-            # Render chat history
-            for i, msg in enumerate(st.session_state.chat_history):
-                if msg["role"] == "assistant":
-                    st.markdown(
-                        f"""
-                        <div class="msg-ai">
-                            <div class="msg-header">🤖 {multilingual.get_phrase("tutor_says", lang_code)}</div>
-                            {msg["content"]}
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
-                    # Add speak/stop buttons for this message
-                    btn_col1, btn_col2, _ = st.columns([1, 1, 4])
-                    with btn_col1:
-                        if st.button("🔊 Speak", key=f"speak_btn_{i}"):
-                            tts_engine.say(msg["content"])
-                    with btn_col2:
-                        if st.button("🛑 Stop", key=f"stop_btn_{i}"):
-                            tts_engine.stop()
-
-                elif msg["role"] == "user" and msg.get("display", True):
-                    st.markdown(
-                        f"""
-                        <div class="msg-student">
-                            <div class="msg-header">🎒 You</div>
-                            {msg["content"]}
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
+    render_chat(selected_lang)
 
     # Student Answer Input
     if st.session_state.session_active:
         st.markdown("---")
         def handle_submit():
-            st.session_state.submit_clicked = True
-            
-        with st.form(key=f"student_form_{meter.turn_count}", clear_on_submit=True):
-            student_input = st.text_area(
-                multilingual.get_phrase("your_answer", lang_code),
-                placeholder="Type your answer or thinking here…",
-                height=100,
-                key=f"student_input_{meter.turn_count}",
-            )
-            st.form_submit_button(
-                f"✅ {multilingual.get_phrase('submit_btn', lang_code)}",
-                on_click=handle_submit
-            )
+            # Runs before the script, so the sidebar meter and the chat history
+            # already reflect this turn when the page renders.
+            user_text = st.session_state.get("student_input", "").strip()
+            if not user_text:
+                st.session_state.submit_empty = True
+                return
 
-        if st.session_state.get("submit_clicked", False):
-            # Reset the flag immediately
-            st.session_state.submit_clicked = False
-            
-            if not student_input.strip():
-                st.warning("⚠️ Please type an answer before submitting! If you are stuck, try typing 'I don't know' or 'Help'.")
-            else:
-                user_text = student_input.strip()
-                meter     = st.session_state.meter
+            # Widget state may be written from callbacks; clears the box for the next turn
+            st.session_state.student_input = ""
 
-                # Score the response
-                result = meter.update(
+            st.session_state.last_result = st.session_state.meter.update(
                 student_reply=user_text,
                 concept=st.session_state.subject,
                 use_llm=False,
                 emotion=st.session_state.current_emotion,
             )
+            st.session_state.chat_history.append(ChatMsg("user", user_text))
+            st.session_state.pending_reply = True
 
-                # Build next Socratic prompt
-                sys_prompt = socratic_prompt.build_system_prompt(
-                    language=selected_lang,
-                    subject=st.session_state.subject,
-                    understanding_score=meter.score,
-                    wrong_answer_count=meter.wrong_streak,
-                    emotion=st.session_state.current_emotion,
-                )
-
-                with st.spinner("Vāṇī is thinking…"):
-                    ai_response = llm_engine.generate(
-                        system_message=sys_prompt,
-                        history=st.session_state.chat_history,
-                        user_message=user_text,
-                    )
-                    
-                # Queue TTS voice
-                tts_engine.start()
-                tts_engine.say(ai_response)
-
-                # Display scoring feedback briefly
-                verdict_emoji = {"correct": "✅", "partial": "🔶", "incorrect": "❌"}
-                st.toast(
-                    f"{result['verdict'].capitalize()} | Score: {result['score']}%",
-                    icon=verdict_emoji.get(result["verdict"], "💬"),
-                )
+        with st.form(key="student_form"):
+            st.text_area(
+                multilingual.get_phrase("your_answer", lang_code),
+                placeholder="Type your answer or thinking here…",
+                height=100,
+                key="student_input",
+            )
+            st.form_submit_button(
+                f"✅ {multilingual.get_phrase('submit_btn', lang_code)}",
+                on_click=handle_submit,
+            )
 
-                # Update history
-                st.session_state.chat_history.append(
-                    {"role": "user", "content": user_text, "display": True}
-                )
-                st.session_state.chat_history.append(
-                    {"role": "assistant", "content": ai_response}
-                )
-                st.rerun()
+        if st.session_state.pop("submit_empty", False):
+            st.warning("⚠️ Please type an answer before submitting! If you are stuck, try typing 'I don't know' or 'Help'.")
 
         # Turn limit reached
         if meter.turn_count >= config.MAX_SOCRATIC_TURNS:
@@ -17,18 +17,38 @@ SUPPORTED_LANGUAGES = {
     "Telugu (తెలుగు)": "te",
 }
 DEFAULT_LANGUAGE = "English"
+# Selectbox options and display name -> position, for O(1) index lookup
+LANG_NAMES = tuple(SUPPORTED_LANGUAGES)
+LANG_INDEX = {name: i for i, name in enumerate(LANG_NAMES)}
 
 # ─── LLM Settings ────────────────────────────────────────────────────────────
-# Name of the model pulled into Ollama (e.g., 'phi3', 'llama3')
+# Name of the model pulled into Ollama (e.g., 'phi3', 'llama3'). CPU decoding is
+# memory-bandwidth bound, so stay on a 4-bit quant: 'phi3' is Q4_0, and
+# 'phi3:3.8b-mini-4k-instruct-q4_K_M' is the same size with slightly better quality.
 OLLAMA_MODEL     = "phi3"
 LLM_CONTEXT_LEN  = 4096
 LLM_MAX_TOKENS   = 512
 LLM_TEMPERATURE  = 0.7
+LLM_HISTORY_TURNS = 6      # recent exchanges sent to the LLM (plus the opening one)
+LLM_NUM_THREADS  = None   # Ollama num_thread; None = let Ollama use physical cores
+LLM_NUM_BATCH    = 512    # prompt tokens evaluated per batch during prefill
+# How long Ollama keeps the model (and its prompt KV cache) resident between turns
+OLLAMA_KEEP_ALIVE = "30m"
 
 # ─── OCR Settings ─────────────────────────────────────────────────────────────
 OCR_LANGUAGE = "en"        # PaddleOCR language code
 OCR_USE_GPU  = False       # Must remain False for offline CPU-only target
 OCR_ANGLE_CLASSIFICATION = True
+IMAGE_MAX_EDGE = 1280      # captured images are downscaled to this long edge (px)
+OCR_BATCH_SIZE = 4         # images per EasyOCR batched forward pass
+OCR_HIGH_CONTRAST_STD = 60 # grayscale std-dev above which preprocessing is skipped
+OCR_USE_OPENCL    = False  # run the preprocessing filters on an OpenCL device if one exists
+OCR_PDF_DPI       = 150    # render resolution for OCR of scanned (image-only) PDFs
+OCR_PDF_MAX_PAGES = 10     # cap on scanned pages OCR'd per document
+
+# ─── Document Parsing ─────────────────────────────────────────────────────────
+PDF_PARALLEL_MIN_PAGES = 32   # PDFs at least this long are split across processes
+PDF_MAX_WORKERS        = 4    # worker processes for page-range extraction of long PDFs
 
 # ─── Webcam ───────────────────────────────────────────────────────────────────
 WEBCAM_INDEX      = 0
@@ -36,6 +56,14 @@ WEBCAM_FRAME_W    = 1280
 WEBCAM_FRAME_H    = 720
 CAPTURE_COUNTDOWN = 3      # seconds countdown before snap
 
+# ─── Emotion Detection ────────────────────────────────────────────────────────
+EMOTION_DETECTOR  = "opencv"   # DeepFace face detector backend (Haar cascade: fastest on CPU)
+EMOTION_FRAME_W   = 640        # capture size for the live tracker camera
+EMOTION_FRAME_H   = 480
+EMOTION_ANALYZE_WIDTH = 320    # frames are shrunk to this width before DeepFace
+EMOTION_SMOOTHING_WINDOW = 3   # analysed frames (~1/s) majority-voted into the shown emotion
+MJPEG_JPEG_QUALITY = 70        # live tracker stream; lower = cheaper encode
+
 # ─── Understanding Meter ─────────────────────────────────────────────────────
 METER_INITIAL_SCORE    = 30   # starting comprehension %
 METER_STEP_CORRECT     = 15   # added when student answers correctly
@@ -45,6 +73,8 @@ METER_STEP_INCORRECT   = -5   # deducted for wrong answers
 # ─── Socratic Engine ─────────────────────────────────────────────────────────
 MAX_SOCRATIC_TURNS = 8        # max back-and-forth turns before a hint
 HINT_THRESHOLD     = 2        # wrong answers before giving a direct hint
+CANNED_MIN_SCORE   = 90       # score at which a correct reply may get a templated follow-up
+CANNED_RATE        = 0.5      # probability the templated follow-up replaces the LLM call
 
 # ─── UI Theming ──────────────────────────────────────────────────────────────
 THEME_PRIMARY   = "#6C63FF"   # indigo-violet
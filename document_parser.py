@@ -2,9 +2,73 @@
 document_parser.py - Extract text from PDF and Word (DOCX) files.
 """
 
+import atexit
 import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from loguru import logger
 
+import config
+
+
+# Worker processes are started once and reused: spawning them (and importing
+# PyMuPDF in each) costs more than extracting text from a mid-sized PDF.
+_pool = None
+_pool_lock = threading.Lock()
+_in_worker = False
+
+
+def _mark_worker():
+    # Pool initializer: a worker parsing a whole document must not fan out again
+    global _in_worker
+    _in_worker = True
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not Linux's default fork: the Streamlit server is
+                # multithreaded by now (script runners, model warmups, TTS and
+                # camera threads), and a forked child can inherit a lock held
+                # mid-import and deadlock on it
+                _pool = ProcessPoolExecutor(
+                    max_workers=min(config.PDF_MAX_WORKERS, os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_mark_worker,
+                )
+                atexit.register(_shutdown_pool)
+    return _pool
+
+
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _text_flags(fitz) -> int:
+    # Plain text mode without TEXT_PRESERVE_LIGATURES: ligatures come out as
+    # their separate letters ("fi", not U+FB01), which is what OCR-style
+    # keyword matching and the LLM expect.
+    return fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+
+def _pdf_range_text(file_bytes: bytes, start: int, stop: int) -> str:
+    """Worker: extract pages [start, stop) from its own copy of the document."""
+    import fitz  # PyMuPDF
+    flags = _text_flags(fitz)
+    with fitz.open(stream=file_bytes, filetype="pdf") as pdf_document:
+        return "\n".join(
+            pdf_document[i].get_text("text", flags=flags) for i in range(start, stop)
+        )
+
+
 def parse_pdf(file_bytes: bytes) -> str:
     """Extract text from a PDF file."""
     try:
@@ -12,41 +76,136 @@ def parse_pdf(file_bytes: bytes) -> str:
     except ImportError:
         return "[PDF parsing unavailable - Please install PyMuPDF]"
     
-    text = ""
     try:
-        pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
-        for page in pdf_document:
-            text += page.get_text() + "\n"
-        pdf_document.close()
+        with fitz.open(stream=file_bytes, filetype="pdf") as pdf_document:
+            page_count = pdf_document.page_count
+            workers = min(config.PDF_MAX_WORKERS, os.cpu_count() or 1)
+            if page_count < config.PDF_PARALLEL_MIN_PAGES or workers < 2 or _in_worker:
+                flags = _text_flags(fitz)
+                return "\n".join(
+                    page.get_text("text", flags=flags) for page in pdf_document
+                ).strip()
+
+        # PyMuPDF is not thread-safe and holds the GIL, so long documents are
+        # split into contiguous page ranges, one process (and document) each.
+        step = -(-page_count // workers)
+        starts = list(range(0, page_count, step))
+        stops = [min(start + step, page_count) for start in starts]
+        pool = _get_pool()
+        chunks = pool.map(_pdf_range_text, [file_bytes] * len(starts), starts, stops)
+        return "\n".join(chunks).strip()
     except Exception as e:
         logger.error(f"Error parsing PDF: {e}")
         return f"[Error parsing PDF: {e}]"
-    return text.strip()
+
+def render_pdf_pages(
+    file_bytes: bytes,
+    dpi: int = config.OCR_PDF_DPI,
+    max_pages: int = config.OCR_PDF_MAX_PAGES,
+) -> list:
+    """Render the first max_pages PDF pages to RGB arrays, for OCR of scanned documents."""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return []
+
+    pages = []
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as pdf_document:
+            for i in range(min(max_pages, pdf_document.page_count)):
+                pix = pdf_document[i].get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+                pages.append(
+                    np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+                )
+    except Exception as e:
+        logger.error(f"Error rendering PDF pages: {e}")
+    return pages
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_RUN_TEXT = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n"}
+
+
+def _docx_text_stream(file_bytes: bytes) -> str:
+    """
+    Paragraph text straight from word/document.xml, parsed incrementally
+    so no full DOM is built. Mirrors python-docx's paragraph.text
+    (runs joined, tabs and breaks kept), one paragraph per line.
+
+    Only text inside a w:r counts, so tab-stop definitions in w:pPr/w:tabs
+    don't leak in. Paragraphs nested in text boxes get their own line
+    rather than being merged into the paragraph around them. Word writes
+    each text box twice (mc:Choice and a VML mc:Fallback copy); the
+    fallback subtree is skipped so the text appears once.
+    """
+    paragraphs = []
+    # One [run text pieces, open w:r depth] entry per currently open w:p
+    open_paragraphs = []
+    fallback_depth = 0
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        with archive.open("word/document.xml") as xml:
+            for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+                tag = elem.tag
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1 if event == "start" else -1
+                    if event == "end":
+                        elem.clear()
+                    continue
+                if fallback_depth:
+                    continue
+                if event == "start":
+                    if tag == _W + "p":
+                        open_paragraphs.append([[], 0])
+                    elif tag == _W + "r" and open_paragraphs:
+                        open_paragraphs[-1][1] += 1
+                    continue
+
+                if tag == _W + "p":
+                    if open_paragraphs:
+                        paragraphs.append("".join(open_paragraphs.pop()[0]))
+                    elem.clear()
+                elif not open_paragraphs:
+                    continue
+                elif tag == _W + "r":
+                    open_paragraphs[-1][1] -= 1
+                elif open_paragraphs[-1][1] > 0:
+                    if tag == _W + "t":
+                        open_paragraphs[-1][0].append(elem.text or "")
+                    elif tag in _DOCX_RUN_TEXT:
+                        open_paragraphs[-1][0].append(_DOCX_RUN_TEXT[tag])
+    return "\n".join(paragraphs).strip()
+
 
 def parse_docx(file_bytes: bytes) -> str:
     """Extract text from a DOCX file."""
+    try:
+        return _docx_text_stream(file_bytes)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        logger.debug(f"Streaming DOCX parse failed ({e}), falling back to python-docx.")
+
     try:
         import docx
     except ImportError:
         return "[DOCX parsing unavailable - Please install python-docx]"
         
-    text = ""
     try:
         doc = docx.Document(io.BytesIO(file_bytes))
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        return "\n".join(para.text for para in doc.paragraphs).strip()
     except Exception as e:
         logger.error(f"Error parsing DOCX: {e}")
         return f"[Error parsing DOCX: {e}]"
-    return text.strip()
+
+# Lower-cased file extension -> parser
+_PARSERS = {
+    "pdf":  parse_pdf,
+    "docx": parse_docx,
+}
+
 
 def parse_document(file_bytes: bytes, file_name: str) -> str:
     """Determine file type and extract text."""
-    lower_name = file_name.lower()
-    if lower_name.endswith('.pdf'):
-        return parse_pdf(file_bytes)
-    elif lower_name.endswith('.docx'):
-        return parse_docx(file_bytes)
-    else:
+    parser = _PARSERS.get(file_name.rpartition(".")[2].lower())
+    if parser is None:
         logger.error(f"Unsupported document format: {file_name}")
         return ""
+    return parser(file_bytes)
@@ -5,19 +5,81 @@ Runs a background thread that captures frames from the webcam and uses
 DeepFace to classify the dominant emotion, storing it to be read by the UI and Core logic.
 """
 
+import importlib.util
+import sys
 import threading
 import time
+from collections import Counter, deque
 import cv2
+import numpy as np
 from loguru import logger
 import config
 from http.server import BaseHTTPRequestHandler, HTTPServer
 import socketserver
 
-try:
-    from deepface import DeepFace
-except ImportError:
+# DeepFace imports TensorFlow, which takes seconds; defer it to a background
+# warm-up thread so neither app cold start nor start() pays for it.
+DeepFace = None
+DEEPFACE_AVAILABLE = importlib.util.find_spec("deepface") is not None
+if not DEEPFACE_AVAILABLE:
     logger.error("DeepFace is not installed. Continuous emotion detection won't work.")
-    DeepFace = None
+
+# Set once the warm-up has finished (successfully or not)
+_warm_event = threading.Event()
+_warm_thread = None
+_warm_lock = threading.Lock()
+
+
+def _load_deepface():
+    """Import DeepFace on first use. Returns the module or None if unavailable."""
+    global DeepFace
+    if DeepFace is None:
+        try:
+            from deepface import DeepFace as _DeepFace
+            DeepFace = _DeepFace
+        except ImportError as e:
+            logger.error(f"DeepFace could not be imported: {e}")
+    return DeepFace
+
+
+def _warm_up_deepface():
+    """
+    Import DeepFace and run one throwaway analysis so it loads the emotion
+    model and the face detector (both cached inside DeepFace for the
+    process) and traces the TF graph before the first real frame arrives.
+    """
+    try:
+        if _load_deepface() is None:
+            return
+        DeepFace.analyze(
+            np.zeros((224, 224, 3), dtype=np.uint8),
+            actions=['emotion'],
+            detector_backend=config.EMOTION_DETECTOR,
+            enforce_detection=False,
+            silent=True,
+        )
+        logger.info("DeepFace emotion model loaded.")
+    except Exception as e:
+        logger.debug(f"DeepFace warm-up failed: {e}")
+    finally:
+        _warm_event.set()
+
+
+def warmup():
+    """Start loading DeepFace in the background (non-blocking, idempotent)."""
+    global _warm_thread
+    if not DEEPFACE_AVAILABLE or _warm_event.is_set():
+        return
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=_warm_up_deepface, daemon=True)
+            _warm_thread.start()
+
+
+_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, config.MJPEG_JPEG_QUALITY]
+
+# CAP_PROP_BUFFERSIZE is honoured by V4L2 but not by the default (GStreamer) backend
+_CAPTURE_API = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
 
 
 class StreamingHandler(BaseHTTPRequestHandler):
@@ -30,18 +92,22 @@ class StreamingHandler(BaseHTTPRequestHandler):
             self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=FRAME')
             self.end_headers()
             try:
+                last_seq = -1
                 while engine._running:
-                    frame = engine.get_annotated_frame_bgr()
-                    if frame is not None:
-                        ret, jpeg = cv2.imencode('.jpg', frame)
-                        if ret:
-                            self.wfile.write(b'--FRAME\r\n')
-                            self.send_header('Content-Type', 'image/jpeg')
-                            self.send_header('Content-Length', len(jpeg.tobytes()))
-                            self.end_headers()
-                            self.wfile.write(jpeg.tobytes())
-                            self.wfile.write(b'\r\n')
-                    time.sleep(0.03)
+                    # Block until the capture thread publishes a new frame so
+                    # duplicates are never re-encoded
+                    seq = engine.wait_for_frame(last_seq, timeout=1.0)
+                    if seq == last_seq:
+                        continue
+                    last_seq = seq
+                    jpeg = engine.get_annotated_jpeg()
+                    if jpeg is not None:
+                        self.wfile.write(b'--FRAME\r\n')
+                        self.send_header('Content-Type', 'image/jpeg')
+                        self.send_header('Content-Length', len(jpeg))
+                        self.end_headers()
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b'\r\n')
             except Exception as e:
                 pass
         else:
@@ -66,26 +132,43 @@ class EmotionEngine:
         self._analyze_thread = None
         self._server_thread = None
         self._server = None
+        # Reference rebinds are atomic and published frames are never written
+        # to again, so readers take the latest emotion/frame without locking.
         self._latest_emotion = "neutral"
+        # Recent per-frame verdicts; the published emotion is their majority
+        self._recent_emotions = deque(maxlen=config.EMOTION_SMOOTHING_WINDOW)
         self._latest_frame_bgr = None
-        self._latest_frame_rgb = None
-        self._lock = threading.Lock()
+        # Only guards the frame sequence number that stream clients wait on
+        self._frame_cond = threading.Condition()
+        self._frame_seq = 0
+        # (frame_seq, emotion, jpeg bytes) of the last encoded overlay frame
+        self._jpeg_cache = (-1, None, None)
+        self._tint = None   # solid "no face" overlay, sized to the frame
 
     def start(self):
         """Starts the background processing threads and MJPEG server."""
-        if DeepFace is None:
+        if not DEEPFACE_AVAILABLE:
             logger.warning("DeepFace missing. EmotionEngine not starting.")
             return
 
         if self._running:
             return
 
-        self.cap = cv2.VideoCapture(self.camera_index)
+        self.cap = cv2.VideoCapture(self.camera_index, _CAPTURE_API)
         if not self.cap.isOpened():
             logger.error("Could not open webcam for EmotionEngine.")
             return
+        # Read the newest frame, not one the driver queued a few frames ago
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # Ask for compressed MJPEG at a modest size: the camera encodes, USB
+        # carries far less than raw YUYV, and analysis/preview never need more.
+        # Drivers that don't support these simply ignore the request.
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.EMOTION_FRAME_W)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.EMOTION_FRAME_H)
 
         self._running = True
+        self._recent_emotions.clear()
         
         # 1. Start Capture Thread (~30 FPS)
         self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
@@ -134,29 +217,48 @@ class EmotionEngine:
                 time.sleep(0.1)
                 continue
 
-            with self._lock:
-                self._latest_frame_bgr = frame.copy()
-                # Also store RGB for Streamlit UI just in case
-                self._latest_frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # read() hands back a fresh array each call, so no copy is needed
+            with self._frame_cond:
+                self._latest_frame_bgr = frame
+                self._frame_seq += 1
+                self._frame_cond.notify_all()
             time.sleep(0.01)
 
     def _analyze_loop(self):
         """Poll the latest frame once a second and run heavy DeepFace evaluation."""
+        # The model loads on the warm-up thread; wait for it rather than
+        # paying the cost on the first real frame
+        warmup()
+        while self._running and not _warm_event.wait(timeout=0.5):
+            pass
+        if DeepFace is None:
+            logger.warning("DeepFace could not be loaded. Emotion analysis disabled.")
+            return
         while self._running:
-            frame = None
-            with self._lock:
-                if self._latest_frame_bgr is not None:
-                    frame = self._latest_frame_bgr.copy()
+            # The capture loop replaces the array rather than writing into it,
+            # so the reference can be analysed without copying
+            frame = self._latest_frame_bgr
             
             if frame is None:
                 time.sleep(0.1)
                 continue
 
+            # Face detection cost scales with pixel count; the emotion model
+            # only ever sees the 48x48 face crop, so accuracy is unaffected
+            h, w = frame.shape[:2]
+            if w > config.EMOTION_ANALYZE_WIDTH:
+                scale = config.EMOTION_ANALYZE_WIDTH / w
+                frame = cv2.resize(
+                    frame, (config.EMOTION_ANALYZE_WIDTH, int(h * scale)),
+                    interpolation=cv2.INTER_AREA,
+                )
+
             try:
                 # Use enforce_detection=False so it doesn't crash if the face is slightly turned
                 res = DeepFace.analyze(
                     frame,
                     actions=['emotion'],
+                    detector_backend=config.EMOTION_DETECTOR,
                     enforce_detection=False,
                     silent=True
                 )
@@ -166,13 +268,11 @@ class EmotionEngine:
                     
                 emotion = res.get('dominant_emotion', 'neutral')
                 
-                with self._lock:
-                    self._latest_emotion = emotion
+                self._publish_emotion(emotion)
 
             except ValueError as ve:
                 if "could not be detected" in str(ve).lower():
-                    with self._lock:
-                        self._latest_emotion = "no_face"
+                    self._publish_emotion("no_face")
                 else:
                     logger.debug(f"EmotionEngine evaluate ValueError: {ve}")
             except Exception as e:
@@ -181,28 +281,60 @@ class EmotionEngine:
             # Polling much faster at 1 second
             time.sleep(1.0)
             
+    def _publish_emotion(self, emotion: str):
+        # A single misread frame (a blink, a head turn) should not flip the
+        # tutor into hint mode, so publish the majority of the recent window
+        self._recent_emotions.append(emotion)
+        self._latest_emotion = Counter(self._recent_emotions).most_common(1)[0][0]
+
+    def warmup(self):
+        """Preload DeepFace ahead of start(), e.g. while OCR is running."""
+        warmup()
+
     def get_latest_emotion(self) -> str:
         """Returns the last detected dominant emotion."""
-        with self._lock:
-            return self._latest_emotion
+        return self._latest_emotion
+
+    def wait_for_frame(self, last_seq: int, timeout: float = None) -> int:
+        """Blocks until a frame newer than last_seq is published; returns the current sequence number."""
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: self._frame_seq != last_seq, timeout=timeout)
+            return self._frame_seq
 
     def get_latest_frame(self):
         """Returns the last captured RGB frame (for legacy stream if needed)."""
-        with self._lock:
-            if self._latest_frame_rgb is not None:
-                return self._latest_frame_rgb.copy()
-            return None
+        frame = self._latest_frame_bgr
+        # Converted on demand: nothing reads RGB on the per-frame path
+        if frame is not None:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return None
             
+    def get_annotated_jpeg(self):
+        """
+        Returns the annotated frame as JPEG bytes. The encode is shared by all
+        stream clients and redone only when the frame or the emotion changes.
+        """
+        key = (self._frame_seq, self._latest_emotion)
+        cached_seq, cached_emotion, jpeg = self._jpeg_cache
+        if key == (cached_seq, cached_emotion):
+            return jpeg
+
+        frame = self.get_annotated_frame_bgr()
+        if frame is None:
+            return None
+        ret, buf = cv2.imencode('.jpg', frame, _JPEG_PARAMS)
+        if not ret:
+            return None
+        jpeg = buf.tobytes()
+        self._jpeg_cache = (*key, jpeg)
+        return jpeg
+
     def get_annotated_frame_bgr(self):
         """Returns a BGR frame with the emotion overlay drawn on it for MJPEG streaming."""
-        frame = None
-        emotion = "neutral"
-        with self._lock:
-            if self._latest_frame_bgr is not None:
-                frame = self._latest_frame_bgr.copy()
-            emotion = self._latest_emotion
-            
-        if frame is None:
+        src = self._latest_frame_bgr
+        emotion = self._latest_emotion
+
+        if src is None:
             return None
             
         EMOTION_EMOJIS = {
@@ -214,10 +346,11 @@ class EmotionEngine:
         text = EMOTION_EMOJIS.get(emotion, emotion.upper())
         
         if emotion == "no_face":
-            # Draw a dark red overlay
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (0, 0), (frame.shape[1], frame.shape[0]), (0, 0, 150), -1) # BGR
-            cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+            # Dark red overlay: one blend against a cached solid tint writes
+            # straight into a new frame (no copy + fill + blend per frame)
+            if self._tint is None or self._tint.shape != src.shape:
+                self._tint = np.full(src.shape, (0, 0, 150), dtype=np.uint8) # BGR
+            frame = cv2.addWeighted(self._tint, 0.6, src, 0.4, 0)
             # Add large warning text
             cv2.putText(
                 frame, 
@@ -229,6 +362,7 @@ class EmotionEngine:
                 2
             )
         else:
+            frame = src.copy()
             color = (0, 255, 0) if emotion in ["happy", "surprise", "neutral"] else (0, 0, 255) # Green vs Red in BGR
             cv2.putText(
                 frame, 
@@ -4,86 +4,324 @@ llm_engine.py - Ollama inference engine for Vani-Vision.
 Uses the local Ollama service for 100% offline inference.
 Make sure Ollama is installed and running, and the 'phi3' model is pulled:
     ollama pull phi3
+
+Tokenisation and prompt evaluation happen inside Ollama, which keeps the KV
+cache of the previous request and only prefills the part of a new prompt that
+differs from it. Requests are therefore shaped so the system prompt and early
+history stay byte-identical from turn to turn (see build_messages and
+window_history); there is no client-side token cache to maintain.
 """
 
 import os
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 import requests
 from loguru import logger
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+    _json_loads = json.loads
+
 import config
 
 OLLAMA_URL = "http://localhost:11434/api/chat"
 OLLAMA_MODEL = getattr(config, "OLLAMA_MODEL", "phi3")
+OLLAMA_KEEP_ALIVE = getattr(config, "OLLAMA_KEEP_ALIVE", "30m")
+# (connect, read) seconds: fail fast if the daemon is down, allow slow decodes
+OLLAMA_TIMEOUT = (2, 60)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Keep-alive connection pool, so turns skip the TCP handshake to Ollama
+_session = requests.Session()
+
+@dataclass(slots=True, frozen=True)
+class ChatMsg:
+    """One chat turn as kept in the session history."""
+    role: str            # "user" | "assistant"
+    content: str
+    display: bool = True
+
+
+# (system prompt, last tutor message, student message) -> reply, oldest first.
+# Process-wide: every browser session shares it, which is safe because the
+# key is the full prompt context, not anything session-specific.
+_REPLY_CACHE_SIZE = 128
+_reply_cache: OrderedDict = OrderedDict()
+# Streamlit runs every browser session's script on its own thread, and a
+# lookup's move_to_end can race another thread's eviction or clear
+_reply_cache_lock = threading.Lock()
+
+# One generation at a time: concurrent sessions would otherwise split the
+# CPU between two decodes inside Ollama and both would crawl.
+_gen_lock = threading.Lock()
+
+
+def _runtime_options() -> dict:
+    # Pin the context size so Ollama never silently truncates the prompt
+    # front (which would shift the prefix and defeat its KV-cache reuse).
+    options = {"num_ctx": config.LLM_CONTEXT_LEN, "num_batch": config.LLM_NUM_BATCH}
+    # Ollama picks its own thread count unless told otherwise
+    if config.LLM_NUM_THREADS:
+        options["num_thread"] = config.LLM_NUM_THREADS
+    return options
+
+
+def _approx_tokens(text: str) -> int:
+    # ~4 characters per token for English BPE vocabularies; close enough to budget with
+    return len(text) // 4 + 1
+
+
+def _reply_key(system_message: str, history: list, user_message: str) -> tuple:
+    last_reply = ""
+    for turn in reversed(history):
+        if turn.role == "assistant":
+            last_reply = turn.content
+            break
+    return (system_message, last_reply, user_message)
+
+
+def _cached_reply(key: tuple):
+    with _reply_cache_lock:
+        reply = _reply_cache.get(key)
+        if reply is not None:
+            _reply_cache.move_to_end(key)
+    if reply is not None:
+        logger.debug("Serving reply from cache.")
+    return reply
+
+
+def _store_reply(key: tuple, reply: str):
+    with _reply_cache_lock:
+        _reply_cache[key] = reply
+        if len(_reply_cache) > _REPLY_CACHE_SIZE:
+            _reply_cache.popitem(last=False)
+
+
+def clear_cache():
+    """Drop all cached replies for every session in this process."""
+    with _reply_cache_lock:
+        _reply_cache.clear()
+
+# (monotonic timestamp, alive) of the last liveness probe
+_OLLAMA_CHECK_TTL = 5.0
+_ollama_status = (float("-inf"), False)
+
+
+def _set_ollama_alive(alive: bool):
+    global _ollama_status
+    _ollama_status = (time.monotonic(), alive)
+
 
 def _check_ollama():
+    checked_at, alive = _ollama_status
+    if time.monotonic() - checked_at < _OLLAMA_CHECK_TTL:
+        return alive
     try:
-        response = requests.get("http://localhost:11434/", timeout=2)
-        return response.status_code == 200
+        response = _session.get("http://localhost:11434/", timeout=2)
+        alive = response.status_code == 200
     except requests.exceptions.RequestException:
-        return False
+        alive = False
+    _set_ollama_alive(alive)
+    return alive
+
+
+_warmup_thread = None
+
+
+def _warmup_worker():
+    try:
+        # An empty messages list makes Ollama load the model without generating
+        _session.post(
+            OLLAMA_URL,
+            json={"model": OLLAMA_MODEL, "messages": [], "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=120,
+        )
+        logger.debug(f"Ollama model '{OLLAMA_MODEL}' warmed up.")
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Ollama warmup skipped: {e}")
+
+
+def warmup():
+    """
+    Load the model into Ollama on a background thread so the cold-start cost
+    overlaps with OCR / document parsing instead of the first reply.
+    """
+    global _warmup_thread
+    if _warmup_thread is not None and _warmup_thread.is_alive():
+        return
+    _warmup_thread = threading.Thread(target=_warmup_worker, daemon=True)
+    _warmup_thread.start()
+
 
+def window_history(
+    history: list,
+    keep_turns: int = config.LLM_HISTORY_TURNS,
+    token_budget: int | None = None,
+) -> list:
+    """
+    Bound the history sent to the LLM so prefill cost stays constant per turn.
+    The opening exchange (which carries the extracted question) is always kept,
+    followed by at most keep_turns recent user/assistant exchanges. If a
+    token_budget is given, the oldest of those exchanges are dropped until
+    the estimated prompt fits.
 
-def build_messages(system_message: str, history: list, user_message: str) -> list:
+    The window start advances in steps of half the window rather than one
+    exchange per turn, so the prompt prefix (and Ollama's KV cache for it)
+    stays identical for several turns in a row.
+    """
+    keep = keep_turns * 2
+    head, tail = history[:2], history[2:]
+    excess = len(tail) - keep
+    if excess > 0:
+        step = max(2, keep // 2 // 2 * 2)
+        tail = tail[-(-excess // step) * step:]
+    if token_budget is not None:
+        used = sum(_approx_tokens(turn.content) for turn in head)
+        used += sum(_approx_tokens(turn.content) for turn in tail)
+        start = 0
+        while used > token_budget and start < len(tail):
+            used -= sum(_approx_tokens(turn.content) for turn in tail[start:start + 2])
+            start += 2
+        tail = tail[start:]
+    return head + tail
+
+
+def build_messages(
+    system_message: str, history: list, user_message: str, turn_context: str = ""
+) -> list:
     """
     Format the conversation history into Ollama's expected message structure.
-    history: list of {"role": "user"|"assistant", "content": "..."} dicts.
+    history: list of ChatMsg turns.
+    turn_context: per-turn instructions, sent as a system message after the
+    history so the stable system prompt + history prefix stays KV-cacheable.
     """
     messages = [{"role": "system", "content": system_message}]
-    
+    budget = (
+        config.LLM_CONTEXT_LEN - config.LLM_MAX_TOKENS
+        - _approx_tokens(system_message) - _approx_tokens(user_message)
+        - _approx_tokens(turn_context)
+    )
+
     # Add history
-    for turn in history:
-        messages.append({
-            "role": turn.get("role", "user"),
-            "content": turn.get("content", "")
-        })
-        
+    for turn in window_history(history, token_budget=budget):
+        messages.append({"role": turn.role, "content": turn.content})
+
+    if turn_context:
+        messages.append({"role": "system", "content": turn_context})
+
     # Add current user message
     messages.append({"role": "user", "content": user_message})
     
     return messages
 
 
-def generate(system_message: str, history: list, user_message: str) -> str:
+def generate(
+    system_message: str, history: list, user_message: str, turn_context: str = ""
+) -> str:
     """
     Generate an LLM response via Ollama. Falls back to canned demo responses 
     if Ollama is not running.
 
     Args:
         system_message: The Socratic persona / language instructions.
-        history:        List of previous {"role", "content"} turns.
+        history:        List of previous ChatMsg turns.
         user_message:   The latest student input or OCR-extracted question.
+        turn_context:   Optional per-turn instructions (see build_messages).
 
     Returns:
         The assistant reply as a plain string.
     """
+    # Same request path as the UI, so this shares the pooled connection,
+    # the reply cache and the generation lock
+    return "".join(
+        generate_stream(system_message, history, user_message, turn_context)
+    ).strip()
+
+
+def generate_stream(
+    system_message: str, history: list, user_message: str, turn_context: str = ""
+):
+    """
+    Stream an LLM response via Ollama, yielding text deltas as they arrive.
+    Falls back to a single canned demo response if Ollama is not running.
+
+    Args:
+        system_message: The Socratic persona / language instructions.
+        history:        List of previous ChatMsg turns.
+        user_message:   The latest student input or OCR-extracted question.
+        turn_context:   Optional per-turn instructions (see build_messages).
+
+    Yields:
+        Successive chunks of the assistant reply.
+    """
+    key = _reply_key(system_message + turn_context, history, user_message)
+    cached = _cached_reply(key)
+    if cached is not None:
+        yield cached
+        return
+
     if not _check_ollama():
         logger.warning("Ollama is not responding at localhost:11434. Falling back to demo mode.")
-        return _demo_response(user_message)
+        yield _demo_response(user_message)
+        return
 
-    messages = build_messages(system_message, history, user_message)
+    messages = build_messages(system_message, history, user_message, turn_context)
 
-    logger.debug(f"Sending prompt to Ollama ({OLLAMA_MODEL})…")
+    logger.debug(f"Streaming prompt to Ollama ({OLLAMA_MODEL})…")
     payload = {
         "model": OLLAMA_MODEL,
         "messages": messages,
-        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "stream": True,
         "options": {
             "temperature": config.LLM_TEMPERATURE,
             "num_predict": config.LLM_MAX_TOKENS,
+            **_runtime_options(),
         }
     }
 
+    parts = []
     try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=60)
-        response.raise_for_status()
-        reply = response.json().get("message", {}).get("content", "").strip()
-        
-        logger.debug(f"Ollama reply ({len(reply)} chars): {reply[:100]}...")
-        return reply
-        
-    except requests.exceptions.RequestException as e:
+        # Held until the stream finishes (or the generator is closed)
+        with _gen_lock, _session.post(
+            OLLAMA_URL, data=_json_dumps(payload), headers=_JSON_HEADERS,
+            stream=True, timeout=OLLAMA_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            # Ollama streams newline-delimited JSON objects, one per token batch
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                delta = chunk.get("message", {}).get("content", "")
+                if delta:
+                    parts.append(delta)
+                    yield delta
+                if chunk.get("done"):
+                    break
+
+        reply = "".join(parts).strip()
+        logger.debug(f"Ollama streamed reply ({len(reply)} chars).")
+        # A completed request is as good as a probe
+        _set_ollama_alive(True)
+        if reply:
+            _store_reply(key, reply)
+
+    except (requests.exceptions.RequestException, ValueError) as e:
         logger.error(f"Ollama API error: {e}")
-        return _demo_response(user_message)
+        if isinstance(e, requests.exceptions.ConnectionError):
+            _set_ollama_alive(False)
+        if not parts:
+            yield _demo_response(user_message)
 
 
 # ─── Demo-Mode Stub Responses ─────────────────────────────────────────────────
@@ -119,6 +357,10 @@ def _demo_response(user_message: str) -> str:
 
 
 def reset_demo():
-    """Reset the demo response counter (call at start of each new session)."""
+    """Reset the demo response counter (call at start of each new session).
+
+    The reply cache is left alone: it is process-wide and content-keyed, so a
+    new session in one browser tab has no reason to wipe it for the others.
+    """
     global _demo_index
     _demo_index = 0
@@ -12,6 +12,8 @@ Strategy:
      itself is fully localised without any network call.
 """
 
+import functools
+
 import config
 from loguru import logger
 
@@ -24,60 +26,87 @@ except ImportError:
 
 
 # ─── UI Phrase Dictionary ─────────────────────────────────────────────────────
-# Maps (phrase_key, lang_code) -> localised string
+# Maps phrase_key -> {lang_code: localised string}
 #
 # lang codes: en, hi, kn, ta, te
 
 UI_PHRASES = {
     # ── Buttons ──────────────────────────────────────────────────────────────
-    ("capture_btn",    "en"): "Capture from Camera",
-    ("capture_btn",    "hi"): "कैमरे से कैप्चर करें",
-    ("capture_btn",    "kn"): "ಕ್ಯಾಮರಾದಿಂದ ಸೆರೆಹಿಡಿಯಿರಿ",
-    ("capture_btn",    "ta"): "கேமராவில் இருந்து பிடிக்கவும்",
-    ("capture_btn",    "te"): "కెమేరా నుండి క్యాప్చర్ చేయండి",
-
-    ("submit_btn",     "en"): "Submit Answer",
-    ("submit_btn",     "hi"): "उत्तर जमा करें",
-    ("submit_btn",     "kn"): "ಉತ್ತರ ಸಲ್ಲಿಸಿ",
-    ("submit_btn",     "ta"): "பதிலை சமர்ப்பிக்கவும்",
-    ("submit_btn",     "te"): "సమాధానం సమర్పించండి",
-
-    ("new_session",    "en"): "New Session",
-    ("new_session",    "hi"): "नया सत्र",
-    ("new_session",    "kn"): "ಹೊಸ ಅಧಿವೇಶನ",
-    ("new_session",    "ta"): "புதிய அமர்வு",
-    ("new_session",    "te"): "కొత్త సెషన్",
+    "capture_btn": {
+        "en": "Capture from Camera",
+        "hi": "कैमरे से कैप्चर करें",
+        "kn": "ಕ್ಯಾಮರಾದಿಂದ ಸೆರೆಹಿಡಿಯಿರಿ",
+        "ta": "கேமராவில் இருந்து பிடிக்கவும்",
+        "te": "కెమేరా నుండి క్యాప్చర్ చేయండి",
+    },
+
+    "submit_btn": {
+        "en": "Submit Answer",
+        "hi": "उत्तर जमा करें",
+        "kn": "ಉತ್ತರ ಸಲ್ಲಿಸಿ",
+        "ta": "பதிலை சமர்ப்பிக்கவும்",
+        "te": "సమాధానం సమర్పించండి",
+    },
+
+    "new_session": {
+        "en": "New Session",
+        "hi": "नया सत्र",
+        "kn": "ಹೊಸ ಅಧಿವೇಶನ",
+        "ta": "புதிய அமர்வு",
+        "te": "కొత్త సెషన్",
+    },
 
     # ── Labels ───────────────────────────────────────────────────────────────
-    ("extracted_text", "en"): "Extracted Question",
-    ("extracted_text", "hi"): "निकाला गया प्रश्न",
-    ("extracted_text", "kn"): "ಹೊರತೆಗೆದ ಪ್ರಶ್ನೆ",
-    ("extracted_text", "ta"): "பிரித்தெடுக்கப்பட்ட கேள்வி",
-    ("extracted_text", "te"): "సంగ్రహించిన ప్రశ్న",
-
-    ("understanding",  "en"): "Comprehension Meter",
-    ("understanding",  "hi"): "समझ मीटर",
-    ("understanding",  "kn"): "ಅರ್ಥಗ್ರಹಣ ಮೀಟರ್",
-    ("understanding",  "ta"): "புரிதல் மீட்டர்",
-    ("understanding",  "te"): "అర్థం మీటర్",
-
-    ("your_answer",    "en"): "Your Answer",
-    ("your_answer",    "hi"): "आपका उत्तर",
-    ("your_answer",    "kn"): "ನಿಮ್ಮ ಉತ್ತರ",
-    ("your_answer",    "ta"): "உங்கள் பதில்",
-    ("your_answer",    "te"): "మీ సమాధానం",
-
-    ("tutor_says",     "en"): "Vani says",
-    ("tutor_says",     "hi"): "वाणी कहती है",
-    ("tutor_says",     "kn"): "ವಾಣಿ ಹೇಳುತ್ತಾಳೆ",
-    ("tutor_says",     "ta"): "வாணி சொல்கிறார்",
-    ("tutor_says",     "te"): "వాణి చెప్తోంది",
-
-    ("upload_image",   "en"): "Upload an Image",
-    ("upload_image",   "hi"): "एक छवि अपलोड करें",
-    ("upload_image",   "kn"): "ಚಿತ್ರವನ್ನು ಅಪ್ಲೋಡ್ ಮಾಡಿ",
-    ("upload_image",   "ta"): "படத்தை பதிவேற்றவும்",
-    ("upload_image",   "te"): "చిత్రాన్ని అప్లోడ్ చేయండి",
+    "extracted_text": {
+        "en": "Extracted Question",
+        "hi": "निकाला गया प्रश्न",
+        "kn": "ಹೊರತೆಗೆದ ಪ್ರಶ್ನೆ",
+        "ta": "பிரித்தெடுக்கப்பட்ட கேள்வி",
+        "te": "సంగ్రహించిన ప్రశ్న",
+    },
+
+    "understanding": {
+        "en": "Comprehension Meter",
+        "hi": "समझ मीटर",
+        "kn": "ಅರ್ಥಗ್ರಹಣ ಮೀಟರ್",
+        "ta": "புரிதல் மீட்டர்",
+        "te": "అర్థం మీటర్",
+    },
+
+    "your_answer": {
+        "en": "Your Answer",
+        "hi": "आपका उत्तर",
+        "kn": "ನಿಮ್ಮ ಉತ್ತರ",
+        "ta": "உங்கள் பதில்",
+        "te": "మీ సమాధానం",
+    },
+
+    "tutor_says": {
+        "en": "Vani says",
+        "hi": "वाणी कहती है",
+        "kn": "ವಾಣಿ ಹೇಳುತ್ತಾಳೆ",
+        "ta": "வாணி சொல்கிறார்",
+        "te": "వాణి చెప్తోంది",
+    },
+
+    "upload_image": {
+        "en": "Upload an Image",
+        "hi": "एक छवि अपलोड करें",
+        "kn": "ಚಿತ್ರವನ್ನು ಅಪ್ಲೋಡ್ ಮಾಡಿ",
+        "ta": "படத்தை பதிவேற்றவும்",
+        "te": "చిత్రాన్ని అప్లోడ్ చేయండి",
+    },
+}
+
+
+# lang_code -> {phrase_key: text}, with the English fallback already applied,
+# so a lookup is two dict reads and no branching
+_RESOLVED_PHRASES = {
+    lang_code: {
+        key: phrases.get(lang_code) or phrases.get("en", key)
+        for key, phrases in UI_PHRASES.items()
+    }
+    for lang_code in config.SUPPORTED_LANGUAGES.values()
 }
 
 
@@ -86,7 +115,7 @@ def get_phrase(key: str, lang_code: str) -> str:
     Return a localised UI phrase. Falls back to English if the key is missing
     for the requested language.
     """
-    return UI_PHRASES.get((key, lang_code)) or UI_PHRASES.get((key, "en"), key)
+    return _RESOLVED_PHRASES.get(lang_code, _RESOLVED_PHRASES["en"]).get(key, key)
 
 
 # ─── Language Code Lookup ─────────────────────────────────────────────────────
@@ -98,6 +127,24 @@ def get_lang_code(lang_display_name: str) -> str:
 
 # ─── Translation Fallback ─────────────────────────────────────────────────────
 
+_translators: dict = {}
+
+
+def _get_translator(target_lang_code: str):
+    """One GoogleTranslator per target language, reused across calls."""
+    translator = _translators.get(target_lang_code)
+    if translator is None:
+        translator = GoogleTranslator(source="auto", target=target_lang_code)
+        _translators[target_lang_code] = translator
+    return translator
+
+
+@functools.lru_cache(maxsize=4096)
+def _translate_cached(text: str, target_lang_code: str) -> str:
+    # Exceptions propagate uncached, so a network failure is retried next time
+    return _get_translator(target_lang_code).translate(text)
+
+
 def translate_to(text: str, target_lang_code: str) -> str:
     """
     Translate text to the target language.
@@ -114,10 +161,7 @@ def translate_to(text: str, target_lang_code: str) -> str:
         return text
 
     try:
-        translated = GoogleTranslator(
-            source="auto", target=target_lang_code
-        ).translate(text)
-        return translated or text
+        return _translate_cached(text, target_lang_code) or text
     except Exception as exc:
         logger.warning(f"Translation failed ({exc}). Returning original text.")
         return text
@@ -2,11 +2,18 @@
 setup_check.py - Vani-Vision environment verification script.
 
 Run this before starting the app to check all dependencies and the model file.
-Usage: python setup_check.py
+Usage: python setup_check.py [--verbose]
+
+--verbose fully imports each package to report its version (slow: easyocr
+pulls in torch).
 """
 
+import importlib
+import importlib.util
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 RESET  = "\033[0m"
 GREEN  = "\033[92m"
@@ -15,10 +22,30 @@ YELLOW = "\033[93m"
 CYAN   = "\033[96m"
 BOLD   = "\033[1m"
 
-def ok(msg):   print(f"  {GREEN}[OK]{RESET}  {msg}")
-def fail(msg): print(f"  {RED}[FAIL]{RESET} {msg}")
-def warn(msg): print(f"  {YELLOW}[WARN]{RESET} {msg}")
-def info(msg): print(f"  {CYAN}[INFO]{RESET} {msg}")
+# Checks running on a worker thread collect their lines here, so the report
+# still prints section by section in order
+_local = threading.local()
+
+def _emit(line):
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None:
+        print(line)
+    else:
+        buffer.append(line)
+
+def ok(msg):   _emit(f"  {GREEN}[OK]{RESET}  {msg}")
+def fail(msg): _emit(f"  {RED}[FAIL]{RESET} {msg}")
+def warn(msg): _emit(f"  {YELLOW}[WARN]{RESET} {msg}")
+def info(msg): _emit(f"  {CYAN}[INFO]{RESET} {msg}")
+
+def _buffered(check):
+    """Run a check with its output captured; returns the lines it emitted."""
+    _local.buffer = []
+    try:
+        check()
+    finally:
+        lines, _local.buffer = _local.buffer, None
+    return lines
 
 
 def check_python():
@@ -28,11 +55,20 @@ def check_python():
     else:
         fail(f"Python 3.10+ required (found {v.major}.{v.minor}.{v.micro})")
 
+VERBOSE = "--verbose" in sys.argv
+
 def check_package(pkg_import, pip_name, critical=True):
-    try:
-        __import__(pkg_import)
-        ok(f"{pip_name}")
-    except ImportError:
+    # find_spec locates the package without running its top-level code
+    if importlib.util.find_spec(pkg_import) is not None:
+        if VERBOSE:
+            try:
+                version = getattr(importlib.import_module(pkg_import), "__version__", "?")
+                ok(f"{pip_name} {version}")
+            except Exception as e:
+                fail(f"{pip_name} is installed but fails to import: {e}")
+        else:
+            ok(f"{pip_name}")
+    else:
         msg = f"{pip_name} not installed  -->  pip install {pip_name}"
         if critical:
             fail(msg)
@@ -50,16 +86,14 @@ def check_model():
         response = requests.get(ollama_url, timeout=5)
         if response.status_code == 200:
             models = response.json().get("models", [])
-            model_tags = [m.get("name") for m in models]
-            
-            # Simple check: 'phi3' or 'phi3:latest'
-            found = False
-            for tag in model_tags:
-                if tag.startswith(model_name):
-                    found = True
-                    break
-                    
-            if found:
+            # Match 'phi3' against 'phi3:latest' as well as exact tags
+            available = set()
+            for m in models:
+                tag = m.get("name") or ""
+                available.add(tag)
+                available.add(tag.split(":")[0])
+
+            if model_name in available:
                 ok(f"Ollama running & model '{model_name}' found.")
             else:
                 warn(
@@ -78,7 +112,10 @@ def check_model():
 def check_webcam():
     try:
         import cv2
-        cap = cv2.VideoCapture(0)
+        # Same backend the app opens the camera with (ocr_engine/emotion_engine)
+        # — and V4L2 skips the slow GStreamer pipeline probe on Linux
+        api = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+        cap = cv2.VideoCapture(0, api)
         if cap.isOpened():
             ok("Webcam detected (index 0)")
             cap.release()
@@ -89,6 +126,12 @@ def check_webcam():
 
 
 if __name__ == "__main__":
+    # The Ollama request and the camera probe each block for up to seconds;
+    # start them now so they overlap the package checks and each other
+    probes = ThreadPoolExecutor(max_workers=2)
+    model_report = probes.submit(_buffered, check_model)
+    webcam_report = probes.submit(_buffered, check_webcam)
+
     print(f"\n{BOLD}{CYAN}=== Vani-Vision Setup Check ==={RESET}\n")
 
     print(f"{BOLD}Python:{RESET}")
@@ -112,10 +155,11 @@ if __name__ == "__main__":
     check_package("langdetect",         "langdetect",      critical=False)
 
     print(f"\n{BOLD}Model file:{RESET}")
-    check_model()
+    print("\n".join(model_report.result()))
 
     print(f"\n{BOLD}Webcam:{RESET}")
-    check_webcam()
+    print("\n".join(webcam_report.result()))
+    probes.shutdown()
 
     print(f"\n{BOLD}To launch Vani-Vision:{RESET}")
     info("streamlit run app.py")
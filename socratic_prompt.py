@@ -5,6 +5,10 @@ Generates the system prompt that shapes the AI into a Socratic tutor and
 manages the escalation logic (from guiding questions -> hints -> near-answer).
 """
 
+import functools
+import random
+import re
+
 import config
 
 # ─── Subject Detection Keywords ───────────────────────────────────────────────
@@ -30,69 +34,62 @@ SUBJECT_KEYWORDS = {
     ],
 }
 
+# Inverted index: one dict probe per distinct word tallies every subject in
+# a single pass, however many keywords there are. Plurals ("forces") map to
+# their keyword up front so no per-call folding pass is needed.
+_SUBJECTS = tuple(SUBJECT_KEYWORDS)
+_KEYWORD_SUBJECT = {
+    keyword: subject_id
+    for subject_id, keywords in enumerate(SUBJECT_KEYWORDS.values())
+    for keyword in keywords
+}
+_KEYWORD_FORMS = {
+    form: keyword
+    for keyword in _KEYWORD_SUBJECT
+    for form in (keyword, keyword + "s")
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+
 
 def detect_subject(text: str) -> str:
     """Detect the likely academic subject from extracted question text."""
-    text_lower = text.lower()
-    scores = {subject: 0 for subject in SUBJECT_KEYWORDS}
-    for subject, keywords in SUBJECT_KEYWORDS.items():
-        for kw in keywords:
-            if kw in text_lower:
-                scores[subject] += 1
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "general"
+    forms = _KEYWORD_FORMS
+    # Whole-word matching; each keyword counts once however often it appears
+    matched = {forms[t] for t in _WORD_RE.findall(text.lower()) if t in forms}
+    # Per-subject counts in a flat list indexed by subject id
+    scores = [0] * len(_SUBJECTS)
+    for keyword in matched:
+        scores[_KEYWORD_SUBJECT[keyword]] += 1
+    best = max(range(len(scores)), key=scores.__getitem__)
+    return _SUBJECTS[best] if scores[best] > 0 else "general"
 
 
 # ─── System Prompt Generator ──────────────────────────────────────────────────
 
-def build_system_prompt(
-    language: str,
-    subject: str,
-    understanding_score: int,
-    wrong_answer_count: int,
-    emotion: str = "neutral",
-) -> str:
-    """
-    Build the LLM system prompt dynamically based on:
-    - language: target response language
-    - subject: detected academic domain
-    - understanding_score: current comprehension meter value (0-100)
-    - wrong_answer_count: consecutive incorrect answers (triggers hint escalation)
-    - emotion: detected facial expression of the student
-    """
-    lang_name = language  # e.g. "Hindi", "English"
+MODE_INSTRUCTIONS = {
+    "scaffolded": (
+        "The student is a beginner and is struggling. "
+        "Explain the core concept they are stuck on step-by-step, breaking it into the simplest possible pieces. "
+        "Use warm, highly encouraging language."
+    ),
+    "socratic": (
+        "Ask guiding questions to help the student reach the answer themselves. "
+        "Never give the direct answer. Encourage them to think critically by asking one question at a time."
+    ),
+    "deep": (
+        "The student shows good understanding. Provide in-depth explanations exploring edge cases "
+        "and real-world applications to expand their knowledge."
+    ),
+    "hint": (
+        "The student has struggled or looks frustrated. "
+        "Gently clarify their confusion with a very simple, direct explanation of the specific part they are stuck on."
+    ),
+}
 
-    # Hint escalation logic
-    if wrong_answer_count >= config.HINT_THRESHOLD or emotion in ["sad", "angry", "fear"]:
-        mode = "hint"
-    elif understanding_score < 30:
-        mode = "scaffolded"    # very basic, lots of encouragement
-    elif understanding_score < 60:
-        mode = "socratic"      # guiding questions
-    else:
-        mode = "deep"          # deeper probing / extension questions
-
-    mode_instructions = {
-        "scaffolded": (
-            "The student is a beginner and is struggling. "
-            "Explain the core concept they are stuck on step-by-step, breaking it into the simplest possible pieces. "
-            "Use warm, highly encouraging language."
-        ),
-        "socratic": (
-            "Ask guiding questions to help the student reach the answer themselves. "
-            "Never give the direct answer. Encourage them to think critically by asking one question at a time."
-        ),
-        "deep": (
-            "The student shows good understanding. Provide in-depth explanations exploring edge cases "
-            "and real-world applications to expand their knowledge."
-        ),
-        "hint": (
-            "The student has struggled or looks frustrated. "
-            "Gently clarify their confusion with a very simple, direct explanation of the specific part they are stuck on."
-        ),
-    }
-
-    prompt = f"""You are Vani, an empathetic offline AI tutor specializing in {subject}.
+
+# Prompt templates, filled with str.format_map; the prefix must stay byte-stable
+_SYSTEM_PREFIX_TMPL = """You are Vani, an empathetic offline AI tutor specializing in {subject}.
 Your sole purpose is to guide students to understand concepts.
 
 LANGUAGE RULE: Always respond ONLY in {lang_name}. 
@@ -107,14 +104,87 @@ BEHAVIOR RULES:
 6. Use simple vocabulary appropriate for a school student.
 7. Keep your responses concise (1-2 short paragraphs max) to encourage dialogue.
 
-CURRENT TEACHING MODE: {mode.upper()}
-{mode_instructions[mode]}
+"""
+
+_SYSTEM_SUFFIX_TMPL = """CURRENT TEACHING MODE: {mode}
+{mode_instructions}
 
-SUBJECT: {subject.capitalize()}
+SUBJECT: {subject_cap}
 STUDENT COMPREHENSION: {understanding_score}%
 STUDENT EMOTION: {emotion} (Adjust your tone accordingly)
 """
-    return prompt
+
+# Only four modes exist, so the mode header and instructions are baked into
+# one template per mode at import; a turn fills just the three student fields
+_SUFFIX_BY_MODE = {
+    mode: _SYSTEM_SUFFIX_TMPL.format_map({
+        "mode": mode.upper(),
+        "mode_instructions": instructions,
+        "subject_cap": "{subject_cap}",
+        "understanding_score": "{understanding_score}",
+        "emotion": "{emotion}",
+    })
+    for mode, instructions in MODE_INSTRUCTIONS.items()
+}
+
+
+@functools.lru_cache(maxsize=32)
+def build_system_prefix(language: str, subject: str) -> str:
+    """
+    The part of the system prompt that is fixed for a whole session.
+    Kept byte-identical across turns so the inference server can reuse its
+    KV cache for this prefix and only prefill the per-turn suffix.
+    """
+    lang_name = language  # e.g. "Hindi", "English"
+
+    return _SYSTEM_PREFIX_TMPL.format_map({"subject": subject, "lang_name": lang_name})
+
+
+def build_system_suffix(
+    subject: str,
+    understanding_score: int,
+    wrong_answer_count: int,
+    emotion: str = "neutral",
+) -> str:
+    """The per-turn tail of the system prompt: teaching mode and student state."""
+    mode = _teaching_mode(understanding_score, wrong_answer_count, emotion)
+    return _SUFFIX_BY_MODE[mode].format_map({
+        "subject_cap": subject.capitalize(),
+        "understanding_score": understanding_score,
+        "emotion": emotion,
+    })
+
+
+def _teaching_mode(understanding_score: int, wrong_answer_count: int, emotion: str) -> str:
+    # Hint escalation logic
+    if wrong_answer_count >= config.HINT_THRESHOLD or emotion in ("sad", "angry", "fear"):
+        return "hint"
+    elif understanding_score < 30:
+        return "scaffolded"    # very basic, lots of encouragement
+    elif understanding_score < 60:
+        return "socratic"      # guiding questions
+    else:
+        return "deep"          # deeper probing / extension questions
+
+
+def build_system_prompt(
+    language: str,
+    subject: str,
+    understanding_score: int,
+    wrong_answer_count: int,
+    emotion: str = "neutral",
+) -> str:
+    """
+    Build the LLM system prompt dynamically based on:
+    - language: target response language
+    - subject: detected academic domain
+    - understanding_score: current comprehension meter value (0-100)
+    - wrong_answer_count: consecutive incorrect answers (triggers hint escalation)
+    - emotion: detected facial expression of the student
+    """
+    return build_system_prefix(language, subject) + build_system_suffix(
+        subject, understanding_score, wrong_answer_count, emotion
+    )
 
 
 # ─── First-Turn Prompt (Problem Introduction) ─────────────────────────────────
@@ -130,6 +200,37 @@ def build_intro_message(ocr_text: str, language: str) -> str:
     )
 
 
+# ─── Canned Follow-ups (high-confidence correct answers) ──────────────────────
+
+CANNED_FOLLOWUPS = {
+    "mathematics": [
+        "Excellent work! Can you explain in your own words why each step of your method is valid?",
+        "Well done! How could you check your answer using a different method?",
+    ],
+    "physics": [
+        "Excellent! Which physical law did you rely on, and when would it stop applying?",
+        "Well done! How would your answer change if one of the quantities were doubled?",
+    ],
+    "chemistry": [
+        "Excellent! Can you explain what is happening at the level of atoms and electrons?",
+        "Well done! Can you think of a reaction in daily life that follows the same idea?",
+    ],
+    "biology": [
+        "Excellent! How does this process help the organism survive?",
+        "Well done! What would happen to the organism if this process stopped?",
+    ],
+    "general": [
+        "Excellent work! Can you explain your reasoning in your own words?",
+        "Well done! Where else could you apply what you just figured out?",
+    ],
+}
+
+
+def pick_canned_followup(subject: str) -> str:
+    """Return a templated next-step question for a confidently correct student reply."""
+    return random.choice(CANNED_FOLLOWUPS.get(subject, CANNED_FOLLOWUPS["general"]))
+
+
 # ─── Understanding Score Evaluator Prompt ─────────────────────────────────────
 
 def build_evaluation_prompt(student_reply: str, expected_concept: str) -> str:
@@ -0,0 +1,93 @@
+"""Streaming DOCX extraction checked against python-docx's paragraph text."""
+
+import io
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("loguru")
+docx = pytest.importorskip("docx")
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Inches
+
+import document_parser
+
+
+def _docx_bytes() -> bytes:
+    doc = docx.Document()
+
+    # Custom tab stops live in w:pPr/w:tabs/w:tab and must not become text
+    tabbed = doc.add_paragraph()
+    tabbed.paragraph_format.tab_stops.add_tab_stop(Inches(1))
+    tabbed.paragraph_format.tab_stops.add_tab_stop(Inches(3))
+    tabbed.add_run("Q1.\tSolve for x\tmarks: 2")
+
+    # A VML text box whose w:p (with its own tab stop) sits inside a run of
+    # the outer paragraph
+    outer = doc.add_paragraph()
+    outer.add_run("Before ")
+    outer._p.append(parse_xml(
+        f"<w:r {nsdecls('w')} xmlns:v=\"urn:schemas-microsoft-com:vml\"><w:pict><v:shape><v:textbox><w:txbxContent>"
+        "<w:p><w:pPr><w:tabs><w:tab w:val=\"left\" w:pos=\"720\"/></w:tabs></w:pPr>"
+        "<w:r><w:t>Inside box</w:t></w:r></w:p>"
+        "</w:txbxContent></v:textbox></v:shape></w:pict></w:r>"
+    ))
+    outer.add_run("after")
+
+    doc.add_paragraph("Last line")
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def test_stream_matches_python_docx_paragraph_text():
+    data = _docx_bytes()
+    expected = [p.text for p in docx.Document(io.BytesIO(data)).paragraphs]
+    lines = document_parser._docx_text_stream(data).split("\n")
+
+    assert expected[0] == "Q1.\tSolve for x\tmarks: 2"
+    for text in expected:
+        assert text in lines
+    # The text box paragraph is the only extra line, kept separate from the
+    # outer paragraph instead of flushing it early
+    assert [line for line in lines if line not in expected] == ["Inside box"]
+
+
+_ALTERNATE_CONTENT_RUN = (
+    # How Word 2010+ saves a text box: a wps shape in mc:Choice and the same
+    # text again as VML in mc:Fallback
+    "<w:r {w}"
+    ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+    ' xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+    ' xmlns:v="urn:schemas-microsoft-com:vml">'
+    "<mc:AlternateContent>"
+    '<mc:Choice Requires="wps"><w:drawing><wps:wsp><wps:txbx><w:txbxContent>'
+    "<w:p><w:r><w:t>Boxed hint</w:t></w:r></w:p>"
+    "</w:txbxContent></wps:txbx></wps:wsp></w:drawing></mc:Choice>"
+    "<mc:Fallback><w:pict><v:shape><v:textbox><w:txbxContent>"
+    "<w:p><w:r><w:t>Boxed hint</w:t></w:r></w:p>"
+    "</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>"
+    "</mc:AlternateContent></w:r>"
+)
+
+
+def test_alternate_content_text_box_is_extracted_once():
+    doc = docx.Document()
+    para = doc.add_paragraph()
+    para.add_run("See box: ")
+    para._p.append(parse_xml(_ALTERNATE_CONTENT_RUN.format(w=nsdecls("w"))))
+    doc.add_paragraph("After")
+    buf = io.BytesIO()
+    doc.save(buf)
+
+    lines = document_parser._docx_text_stream(buf.getvalue()).split("\n")
+
+    assert lines.count("Boxed hint") == 1
+    assert "See box: " in lines and "After" in lines
+
+
+def test_parse_docx_uses_stream():
+    assert document_parser.parse_docx(_docx_bytes()).startswith("Q1.\tSolve for x")
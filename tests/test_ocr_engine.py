@@ -0,0 +1,67 @@
+"""Grayscale handling in draw_bounding_boxes: no mirroring, no crash."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("loguru")
+Image = pytest.importorskip("PIL.Image")
+
+import ocr_engine
+
+
+def _gray() -> np.ndarray:
+    # Left half dark, right half light: a horizontal mirror is easy to spot
+    img = np.full((40, 60), 200, dtype=np.uint8)
+    img[:, :30] = 20
+    return img
+
+
+def _fake_ocr(monkeypatch, results):
+    monkeypatch.setattr(ocr_engine, "EASYOCR_AVAILABLE", True)
+    monkeypatch.setattr(ocr_engine, "run_ocr", lambda *a, **k: (results, 1.0))
+
+
+@pytest.mark.parametrize("as_pil", [False, True])
+def test_grayscale_without_detections_is_returned_unmirrored(monkeypatch, as_pil):
+    gray = _gray()
+    _fake_ocr(monkeypatch, [])
+    image = Image.fromarray(gray, mode="L") if as_pil else gray
+
+    out = ocr_engine.draw_bounding_boxes(image)
+
+    np.testing.assert_array_equal(np.asarray(out), gray)
+
+
+@pytest.mark.parametrize("as_pil", [False, True])
+def test_grayscale_with_detections_is_drawn_in_colour(monkeypatch, as_pil):
+    gray = _gray()
+    box = [[35, 5], [55, 5], [55, 15], [35, 15]]
+    _fake_ocr(monkeypatch, [(box, "x", 0.9)])
+    image = Image.fromarray(gray, mode="L") if as_pil else gray
+
+    out = np.asarray(ocr_engine.draw_bounding_boxes(image))
+
+    assert out.shape == (40, 60, 3)
+    # Untouched pixels keep their side of the image
+    assert (out[35, 5] == 20).all() and (out[35, 55] == 200).all()
+    # The outline keeps its colour (BGR (0, 255, 128) shown as RGB), i.e. the
+    # grayscale frame was promoted before drawing
+    assert tuple(out[5, 45]) == (128, 255, 0)
+
+
+def test_prepare_accepts_2d_arrays():
+    prepared, scale = ocr_engine._prepare(_gray(), preprocess=True, bgr=True)
+    assert prepared.ndim == 2 and scale == 1.0
+
+
+@pytest.mark.parametrize("available", [False, True])
+def test_grayscale_fallbacks_are_returned_unmirrored(monkeypatch, available):
+    gray = _gray()
+    # Engine missing entirely, or installed but failed to initialise
+    monkeypatch.setattr(ocr_engine, "EASYOCR_AVAILABLE", available)
+    monkeypatch.setattr(ocr_engine, "run_ocr", lambda *a, **k: (None, 1.0))
+
+    out = ocr_engine.draw_bounding_boxes(gray, bgr=True)
+
+    np.testing.assert_array_equal(np.asarray(out), gray)
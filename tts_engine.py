@@ -4,8 +4,11 @@ tts_engine.py - Offline Text-to-Speech engine for Vani-Vision.
 Uses the native OS speech synthesizer (e.g., SAPI5 on Windows) via pyttsx3.
 """
 
+from collections import deque
+
 from loguru import logger
 import threading
+import time
 import multiprocessing
 
 try:
@@ -19,17 +22,41 @@ try:
 except ImportError:
     pythoncom = None
 
+# Consecutive speech failures after which the driver is treated as broken
+_MAX_TTS_FAILURES = 3
+
+# Markdown emphasis / heading / code characters the synthesiser would read aloud.
+# "_" also joins words (snake_case, "x_1") so it becomes a space rather than
+# gluing them together, and "~" is the tutor's shorthand for "approximately".
+_TTS_STRIP = str.maketrans({'*': None, '#': None, '`': None, '_': ' ', '~': 'about '})
+
 class TTSEngine:
     def __init__(self):
         self._muted = False
+        # Set by the worker when the driver keeps failing; unlike _muted it is
+        # not touched by set_muted(), only cleared by reenable()
+        self._disabled = False
+        self._failures = 0
         self._current_engine = None
-        self._speech_thread = None
+        # Pending utterances; say() only enqueues so the rerun never waits on
+        # speech. maxlen makes a full queue drop its oldest entry on append.
+        self._pending = deque(maxlen=4)
+        self._pending_cond = threading.Condition()
+        self._worker = None
+        self._worker_lock = threading.Lock()
 
     def start(self):
-        pass
+        """Starts the background speech worker if it is not already running."""
+        if pyttsx3 is None:
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._process_loop, daemon=True)
+                self._worker.start()
 
     def stop(self):
-        """Attempts to stop the currently running speech synthesis."""
+        """Drops queued speech and attempts to stop the utterance currently playing."""
+        self._drain()
         if self._current_engine is not None:
             try:
                 self._current_engine.stop()
@@ -37,54 +64,105 @@ class TTSEngine:
                 logger.debug(f"Could not cleanly stop TTS: {e}")
         
     def set_muted(self, muted: bool):
-        """Enable or disable voice output."""
+        """Enable or disable voice output; muting also drops queued speech."""
         self._muted = muted
+        if muted:
+            self._drain()
+
+    @property
+    def is_disabled(self) -> bool:
+        """True once speech was switched off after repeated driver failures."""
+        return self._disabled
+
+    def reenable(self):
+        """Clear the failure state so the driver is tried again (explicit user action)."""
+        self._failures = 0
+        self._disabled = False
 
     def say(self, text: str):
-        """Speaks the text asynchronously by spawning a dedicated daemon thread."""
-        if pyttsx3 is None or self._muted or not text:
+        """Queues the text for the background worker and returns immediately."""
+        if pyttsx3 is None or self._muted or self._disabled or not text:
             return
         
-        clean_text = text.replace('*', '').replace('#', '').strip()
+        clean_text = text.translate(_TTS_STRIP).strip()
         if not clean_text:
             return
 
-        # Stop any currently playing audio
-        self.stop()
-        
-        self._speech_thread = threading.Thread(
-            target=self._speak_worker, 
-            args=(clean_text,), 
-            daemon=True
-        )
-        self._speech_thread.start()
-
-    def _speak_worker(self, text: str):
+        self.start()
+        with self._pending_cond:
+            if len(self._pending) == self._pending.maxlen:
+                logger.debug("TTS queue full, dropping the oldest utterance.")
+            self._pending.append(clean_text)
+            self._pending_cond.notify()
+
+    def _drain(self):
+        with self._pending_cond:
+            self._pending.clear()
+
+    def _next_utterance(self) -> str:
+        # Sleeps without a timeout: the worker only wakes when say() enqueues
+        with self._pending_cond:
+            while not self._pending:
+                self._pending_cond.wait()
+            return self._pending.popleft()
+
+    def _process_loop(self):
+        # COM is initialised once for the lifetime of the worker thread
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
         try:
+            while True:
+                text = self._next_utterance()
+                if self._disabled:
+                    continue
+                if self._speak(text):
+                    self._failures = 0
+                    continue
+                self._failures += 1
+                if self._failures >= _MAX_TTS_FAILURES:
+                    # The driver keeps failing even after rebuilds; stop
+                    # feeding it until the user switches voice back on
+                    logger.error("TTS keeps failing; disabling voice output.")
+                    self._disabled = True
+                    self._drain()
+                else:
+                    # Back off so a wedged COM/driver state isn't hammered
+                    time.sleep(min(8.0, 2 ** self._failures))
+        finally:
             if pythoncom is not None:
-                pythoncom.CoInitialize()
-            
+                pythoncom.CoUninitialize()
+
+    def _ensure_engine(self):
+        # Created on the worker thread (SAPI objects belong to the thread that
+        # made them) and configured once; init + voice enumeration cost
+        # hundreds of ms, far more than speaking a short reply.
+        if self._current_engine is None:
             engine = pyttsx3.init()
-            self._current_engine = engine
-            
+
             voices = engine.getProperty('voices')
             for voice in voices:
                 if "zira" in voice.name.lower() or "female" in voice.name.lower():
                     engine.setProperty('voice', voice.id)
                     break
-                    
+
             rate = engine.getProperty('rate')
             engine.setProperty('rate', max(100, rate - 25))
-            
+            self._current_engine = engine
+        return self._current_engine
+
+    def _speak(self, text: str) -> bool:
+        """Speak one utterance; returns False if the driver raised."""
+        try:
+            engine = self._ensure_engine()
             logger.info("Speaking aloud...")
             engine.say(text)
             engine.runAndWait()
+            return True
         except Exception as e:
             logger.error(f"TTS error while speaking: {e}")
-        finally:
+            # Rebuild the driver on the next utterance rather than reuse a broken one
             self._current_engine = None
-            if pythoncom is not None:
-                pythoncom.CoUninitialize()
+            return False
 
 # Provide a global instance for the app to use
 engine = TTSEngine()
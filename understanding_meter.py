@@ -9,11 +9,49 @@ The score drives the Socratic escalation mode in socratic_prompt.py.
 """
 
 import re
-import json
 from loguru import logger
 import config
 
 
+# Only the score is used from the evaluator's JSON reply; a regex also copes
+# with the prose or code fences small models wrap around it
+_SCORE_RE = re.compile(r'"score"\s*:\s*"?(\d{1,3})')
+
+# Facial expressions that speed up hint escalation
+_STRUGGLING_EMOTIONS = frozenset({"sad", "angry", "fear"})
+
+
+# ─── Score Bands ──────────────────────────────────────────────────────────────
+
+def _score_lut(bands: tuple) -> tuple:
+    """Expand (floor, value) bands, highest floor first, into one entry per score 0-100."""
+    return tuple(
+        next(value for floor, value in bands if score >= floor)
+        for score in range(101)
+    )
+
+# Read on every UI render, so precomputed per score instead of re-branching
+_BADGE_BY_SCORE = _score_lut((
+    (85, "Expert"),
+    (65, "Proficient"),
+    (45, "Developing"),
+    (25, "Beginner"),
+    (0,  "Needs Help"),
+))
+_COLOR_BY_SCORE = _score_lut((
+    (75, config.THEME_SUCCESS),
+    (45, config.THEME_WARNING),
+    (0,  config.THEME_DANGER),
+))
+_EMOJI_BY_SCORE = _score_lut((
+    (85, "🌟"),
+    (65, "✅"),
+    (45, "📚"),
+    (25, "🌱"),
+    (0,  "🆘"),
+))
+
+
 # ─── Session State ────────────────────────────────────────────────────────────
 
 class UnderstandingMeter:
@@ -43,24 +81,22 @@ class UnderstandingMeter:
         r"^\s*\?+\s*$",
     ]
 
+    # Each list compiled once into a single alternation, so a reply is
+    # scanned once per list instead of once per pattern. IGNORECASE stands in
+    # for lowercasing the reply first.
+    _POSITIVE_RE = re.compile("|".join(f"(?:{p})" for p in POSITIVE_SIGNALS), re.IGNORECASE)
+    _NEGATIVE_RE = re.compile("|".join(f"(?:{p})" for p in NEGATIVE_SIGNALS), re.IGNORECASE)
+
     def _heuristic_score(self, student_reply: str) -> tuple[str, int]:
         """
         Returns (verdict, delta) where:
           verdict: "correct" | "partial" | "incorrect"
           delta:   score change value
         """
-        text = student_reply.lower()
-
-        pos_hits = sum(
-            1 for pattern in self.POSITIVE_SIGNALS
-            if re.search(pattern, text)
-        )
-        neg_hits = sum(
-            1 for pattern in self.NEGATIVE_SIGNALS
-            if re.search(pattern, text)
-        )
-
-        if pos_hits >= 1 and neg_hits == 0:
+        # Only "any hit" matters, so search() stops at the first match. The
+        # short negative list goes first: a hit there decides the verdict
+        # without running the much larger positive alternation at all.
+        if not self._NEGATIVE_RE.search(student_reply) and self._POSITIVE_RE.search(student_reply):
             return "correct", config.METER_STEP_CORRECT
         else:
             return "incorrect", config.METER_STEP_INCORRECT
@@ -88,8 +124,10 @@ class UnderstandingMeter:
                 history=[],
                 user_message=eval_prompt,
             )
-            data = json.loads(raw.strip())
-            score_val = int(data.get("score", 50))
+            match = _SCORE_RE.search(raw)
+            if match is None:
+                raise ValueError("no score in evaluator reply")
+            score_val = int(match.group(1))
 
             if score_val >= 70:
                 return "correct", config.METER_STEP_CORRECT
@@ -133,13 +171,13 @@ class UnderstandingMeter:
         # Update streak
         if verdict == "incorrect":
             # Frustrated/angry/sad students get hints much faster
-            if emotion in ["sad", "angry", "fear"]:
+            if emotion in _STRUGGLING_EMOTIONS:
                 self.wrong_streak += 2
                 delta -= 5 # Deduct more points for frustration to trigger easy mode
             else:
                 self.wrong_streak += 1
         else:
-            if emotion in ["sad", "angry", "fear"] and verdict == "partial":
+            if emotion in _STRUGGLING_EMOTIONS and verdict == "partial":
                 # Still struggling mentally even if answer is okay
                 self.wrong_streak += 1
             else:
@@ -170,36 +208,13 @@ class UnderstandingMeter:
 
     @staticmethod
     def _badge(score: int) -> str:
-        if score >= 85:
-            return "Expert"
-        elif score >= 65:
-            return "Proficient"
-        elif score >= 45:
-            return "Developing"
-        elif score >= 25:
-            return "Beginner"
-        else:
-            return "Needs Help"
+        return _BADGE_BY_SCORE[score]
 
     @property
     def color(self) -> str:
         """Return a hex color matching the current score band for the UI gauge."""
-        if self.score >= 75:
-            return config.THEME_SUCCESS
-        elif self.score >= 45:
-            return config.THEME_WARNING
-        else:
-            return config.THEME_DANGER
+        return _COLOR_BY_SCORE[self.score]
 
     @property
     def emoji(self) -> str:
-        if self.score >= 85:
-            return "🌟"
-        elif self.score >= 65:
-            return "✅"
-        elif self.score >= 45:
-            return "📚"
-        elif self.score >= 25:
-            return "🌱"
-        else:
-            return "🆘"
+        return _EMOJI_BY_SCORE[self.score]